@@ -1,10 +1,26 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, g, request, jsonify, stream_with_context
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
 import os
 import json
 import logging
+import math
+import multiprocessing
+import threading
+import time
+import unicodedata
 import requests
 
+import chart_math
+import fol
+import gazetteer
+import http_pool
+import llm_jobs
+import metrics
+from tiered_cache import MISS, TieredCache
+from training_log import TrainingLogWriter
+
 try:
     import swisseph as swe
     swe.set_ephe_path("/app/ephe")
@@ -13,6 +29,12 @@ except:
     import ephem
     from datetime import datetime as dt
 
+try:
+    import fol_timeline
+except ImportError:
+    # Only /fol_timeline needs it
+    fol_timeline = None
+
 app = Flask(__name__)
 app.config['JSON_SORT_KEYS'] = False
 
@@ -112,15 +134,51 @@ def generate_interpretation(planet, sign, house):
     return interpretation
 
 
+GEOCODE_CACHE = TieredCache(
+    "geocode",
+    maxsize=int(os.environ.get("GEOCODE_CACHE_SIZE", 2048)),
+    ttl=float(os.environ.get("GEOCODE_CACHE_TTL", 30 * 24 * 3600)),
+    negative_ttl=float(os.environ.get("GEOCODE_NEGATIVE_TTL", 3600)),
+    db_path=os.environ.get("SOULTETHER_CACHE_DB", "soultether_cache.sqlite3"),
+)
+
+
+def normalize_location(location_str):
+    text = unicodedata.normalize("NFKC", str(location_str or "")).casefold()
+    parts = [" ".join(part.split()) for part in text.split(",")]
+    return ", ".join(part for part in parts if part).strip(" .")
+
+
 def geocode_location(location_str):
+    local = gazetteer.lookup(location_str)
+    if local is not None:
+        return local
+    
+    key = normalize_location(location_str)
+    cached = GEOCODE_CACHE.get(key)
+    
+    if cached is MISS:
+        with metrics.timed("geocode_remote"):
+            cached = _geocode_remote(location_str)
+        GEOCODE_CACHE.set(key, list(cached) if cached else None)
+    
+    if cached is None:
+        raise ValueError(f"Location not found: {location_str}")
+    
+    return float(cached[0]), float(cached[1])
+
+
+def _geocode_remote(location_str):
+    """Returns (lat, lon), or None when the geocoders definitely found nothing.
+    Transport failures raise ValueError so they are never negatively cached."""
     geoapify_key = os.environ.get("GEOAPIFY_API_KEY")
     
     if geoapify_key:
         try:
-            response = requests.get(
+            response = http_pool.get(
+                "geoapify",
                 "https://api.geoapify.com/v1/geocode/search",
                 params={"text": location_str, "apiKey": geoapify_key},
-                timeout=10
             )
             if response.status_code == 200 and response.json().get("features"):
                 result = response.json()["features"][0]["properties"]
@@ -129,27 +187,83 @@ def geocode_location(location_str):
             pass
     
     try:
-        response = requests.get(
+        response = http_pool.get(
+            "nominatim",
             "https://nominatim.openstreetmap.org/search",
             params={"q": location_str, "format": "json"},
-            timeout=10,
             headers={"User-Agent": "SoulTether"}
         )
-        if response.status_code == 200 and response.json():
-            result = response.json()[0]
-            return float(result["lat"]), float(result["lon"])
-        else:
-            raise ValueError(f"Location not found: {location_str}")
     except requests.Timeout:
         raise ValueError(f"Geocoding timeout: Could not reach location service")
     except Exception as e:
         raise ValueError(f"Geocoding error: {str(e)}")
+    
+    if response.status_code != 200:
+        raise ValueError(f"Geocoding error: location service returned {response.status_code}")
+    
+    try:
+        results = response.json()
+        if not results:
+            return None
+        return float(results[0]["lat"]), float(results[0]["lon"])
+    except Exception as e:
+        raise ValueError(f"Geocoding error: {str(e)}")
+
+
+CHART_CACHE_PRECISION = int(os.environ.get("CHART_CACHE_COORD_PRECISION", 4))
+
+CHART_CACHE = TieredCache(
+    "chart",
+    maxsize=int(os.environ.get("CHART_CACHE_SIZE", 4096)),
+    ttl=float(os.environ.get("CHART_CACHE_TTL", 0)) or None,
+    db_path=(
+        os.environ.get("SOULTETHER_CACHE_DB", "soultether_cache.sqlite3")
+        if os.environ.get("CHART_CACHE_SHARED", "").lower() in ("1", "true", "yes")
+        else None
+    ),
+)
+
+
+def chart_cache_key(dt, lat, lon, house_system):
+    backend = "swe" if swe is not None else "ephem"
+    return "|".join((
+        backend,
+        house_system,
+        dt.strftime("%Y-%m-%dT%H:%MZ"),
+        f"{round(lat, CHART_CACHE_PRECISION):.{CHART_CACHE_PRECISION}f}",
+        f"{round(lon, CHART_CACHE_PRECISION):.{CHART_CACHE_PRECISION}f}",
+    ))
+
+
+# pyswisseph keeps global state and is not thread-safe. LLM job threads (and
+# gthread workers, when enabled) compute charts alongside request threads.
+_swe_lock = threading.Lock()
+
+
+def get_full_chart(dt, lat, lon, house_system="P"):
+    key = chart_cache_key(dt, lat, lon, house_system)
+    chart = CHART_CACHE.get(key)
+    
+    if chart is MISS:
+        with _swe_lock:
+            chart = _compute_full_chart(dt, lat, lon, house_system)
+        CHART_CACHE.set(key, chart)
+    
+    # Callers decorate the chart (location_name etc.), so never hand out the cached dict
+    return dict(
+        chart,
+        lat=lat,
+        lon=lon,
+        planets={name: dict(data) for name, data in chart["planets"].items()},
+        cusps=list(chart["cusps"]),
+        aspects=[dict(aspect) for aspect in chart["aspects"]],
+    )
 
 
-def get_full_chart(dt, lat, lon):
+def _compute_full_chart(dt, lat, lon, house_system):
     if swe is not None:
         jd = swe.julday(dt.year, dt.month, dt.day, dt.hour + dt.minute / 60.0)
-        houses, ascmc = swe.houses(jd, lat, lon, b"P")
+        houses, ascmc = swe.houses(jd, lat, lon, house_system.encode())
         cusps = houses
         asc = ascmc[0]
         mc = ascmc[1]
@@ -168,12 +282,13 @@ def get_full_chart(dt, lat, lon):
             swe.MEAN_NODE: "North Node",
         }
 
+        houses = chart_math.HouseIndex(cusps)
         planet_data = {}
         for body, name in planets.items():
             lon_deg = swe.calc_ut(jd, body)[0][0]
             sign_idx = int(lon_deg // 30)
             deg_in_sign = lon_deg % 30
-            house_num = get_house_number(lon_deg, cusps)
+            house_num = houses.house(lon_deg)
             planet_data[name] = {
                 "lon": lon_deg,
                 "sign": SIGNS[sign_idx],
@@ -190,7 +305,7 @@ def get_full_chart(dt, lat, lon):
             "asc": f"{SIGNS[int(asc // 30)]} {asc % 30:.2f}°",
             "mc": f"{SIGNS[int(mc // 30)]} {mc % 30:.2f}°",
             "planets": planet_data,
-            "cusps": cusps,
+            "cusps": list(cusps),
             "aspects": aspects,
         }
     else:
@@ -216,34 +331,34 @@ def get_full_chart_ephem(dt, lat, lon):
         'Pluto': ephem.Pluto(),
     }
     
+    # Without Swiss Ephemeris, houses are Porphyry cusps from the true angles
+    centuries = (observer.date - ephem.J2000) / 36525.0
+    obliquity = 23.4392911 - 0.0130042 * centuries
+    ramc = math.degrees(observer.sidereal_time())
+    asc, mc = chart_math.ascendant_midheaven(ramc, lat, obliquity)
+    cusps = chart_math.porphyry_cusps(asc, mc)
+    houses = chart_math.HouseIndex(cusps)
+    
     planet_data = {}
     for name, body in planet_objects.items():
         body.compute(observer)
-        lon_deg = float(body.hlon) * 180 / 3.14159265359
-        lon_deg = lon_deg % 360
+        lon_deg = math.degrees(ephem.Ecliptic(body, epoch=observer.date).lon) % 360
         sign_idx = int(lon_deg // 30)
         deg_in_sign = lon_deg % 30
         planet_data[name] = {
             "lon": lon_deg,
             "sign": SIGNS[sign_idx % 12],
             "deg": deg_in_sign,
-            "house": 1,
+            "house": houses.house(lon_deg),
         }
     
     planet_data['North Node'] = {
         "lon": 0,
         "sign": "Aries",
         "deg": 0,
-        "house": 1,
+        "house": houses.house(0),
     }
     
-    sun = ephem.Sun()
-    sun.compute(observer)
-    sun_lon = float(sun.hlon) * 180 / 3.14159265359 % 360
-    
-    asc = sun_lon
-    mc = sun_lon + 90
-    
     aspects = calculate_aspects(planet_data)
     
     return {
@@ -253,86 +368,25 @@ def get_full_chart_ephem(dt, lat, lon):
         "asc": f"{SIGNS[int(asc // 30)]} {asc % 30:.2f}°",
         "mc": f"{SIGNS[int(mc // 30) % 12]} {mc % 30:.2f}°",
         "planets": planet_data,
-        "cusps": [0] * 12,
+        "cusps": cusps,
         "aspects": aspects,
     }
 
 
 def calculate_aspects(planet_data, orb=8.0):
-    aspect_angles = {
-        0: ("Conjunction", 8.0),
-        60: ("Sextile", 6.0),
-        90: ("Square", 8.0),
-        120: ("Trine", 8.0),
-        180: ("Opposition", 8.0),
-        150: ("Quincunx", 3.0),
-    }
-    
-    aspects = []
-    planets_list = list(planet_data.items())
-    
-    for i, (name1, data1) in enumerate(planets_list):
-        for name2, data2 in planets_list[i+1:]:
-            lon1 = data1["lon"]
-            lon2 = data2["lon"]
-            
-            diff = abs(lon1 - lon2)
-            if diff > 180:
-                diff = 360 - diff
-            
-            for angle, (aspect_name, max_orb) in aspect_angles.items():
-                orb_diff = abs(diff - angle)
-                if orb_diff <= max_orb:
-                    aspects.append({
-                        "object1": name1,
-                        "object2": name2,
-                        "type": aspect_name,
-                        "orb": orb_diff if diff < 180 else -orb_diff,
-                        "angle": angle,
-                    })
-                    break
-    
-    return aspects
+    return chart_math.calculate_aspects(planet_data)
 
 
 def get_house_number(planet_lon, cusps):
-    planet_lon = planet_lon % 360
-    for i in range(12):
-        cusp_start = cusps[i] % 360
-        cusp_end = cusps[(i + 1) % 12] % 360
-        if cusp_start < cusp_end:
-            if cusp_start <= planet_lon < cusp_end:
-                return i + 1
-        else:
-            if planet_lon >= cusp_start or planet_lon < cusp_end:
-                return i + 1
-    return 1
+    return chart_math.HouseIndex(cusps).house(planet_lon)
 
 
 def calculate_fol_nodes():
-    increment = 360.0 / 432.0
-    
-    nodes = [
-        0, 7.5, 15, 22.5, 30, 37.5, 45, 52.5, 60, 67.5, 75, 82.5, 90, 97.5, 105, 112.5, 120, 127.5, 135, 142.5,
-        150, 157.5, 165, 172.5, 180, 187.5, 195, 202.5, 210, 217.5, 225, 232.5, 240, 247.5, 255, 262.5, 270,
-        277.5, 285, 292.5, 300, 307.5, 315, 322.5, 330, 337.5, 345, 352.5
-    ]
-    
-    nodes = nodes[:37]
-    
-    nodes_snapped = []
-    for angle in nodes:
-        multiple = round(angle / increment)
-        snapped = (multiple % 432) * increment
-        nodes_snapped.append((snapped, multiple % 432))
-    
-    nodes_snapped = sorted(list(set(nodes_snapped)))
-    
-    return nodes_snapped
+    return fol.get_grid().nodes
 
 
-def calculate_fol(chart, orb_threshold=2.0):
-    fol_nodes = calculate_fol_nodes()
+def calculate_fol(chart, orb_threshold=2.0, grid=None):
+    fol_grid = fol.get_grid(grid)
     
     hits = []
     planets_data = {}
@@ -347,31 +401,31 @@ def calculate_fol(chart, orb_threshold=2.0):
     else:
         planets_data = chart.get("planets", {})
     
-    for name, data in planets_data.items():
-        lon = data["lon"] % 360
+    names = list(planets_data)
+    lons = [planets_data[name]["lon"] % 360 for name in names]
+    
+    for body, node, diff in fol_grid.match_many(lons, orb_threshold):
+        name = names[body]
+        data = planets_data[name]
+        lon = lons[body]
+        node_angle = fol_grid.angles[node]
+        node_multiple = fol_grid.multiples[node]
+        sign = data["sign"]
+        house = data["house"]
+        interpretation = generate_interpretation(name, sign, house)
         
-        for node_angle, node_multiple in fol_nodes:
-            diff = abs(lon - node_angle)
-            if diff > 180:
-                diff = 360 - diff
-            
-            if diff <= orb_threshold:
-                sign = data["sign"]
-                house = data["house"]
-                interpretation = generate_interpretation(name, sign, house)
-                
-                hits.append(
-                    {
-                        "name": name,
-                        "lon": lon,
-                        "node": node_angle,
-                        "node_multiple": node_multiple,
-                        "orb": diff,
-                        "sign": sign,
-                        "house": house,
-                        "interpretation": interpretation,
-                    }
-                )
+        hits.append(
+            {
+                "name": name,
+                "lon": lon,
+                "node": node_angle,
+                "node_multiple": node_multiple,
+                "orb": diff,
+                "sign": sign,
+                "house": house,
+                "interpretation": interpretation,
+            }
+        )
     
     hits.sort(key=lambda h: h["orb"])
     
@@ -415,6 +469,16 @@ def generate_reading(hits, chart):
     return "\n".join(reading)
 
 
+TRAINING_LOG = TrainingLogWriter(
+    path=os.environ.get("TRAINING_DATA_PATH", "training_data.jsonl"),
+    segment_dir=os.environ.get("TRAINING_SEGMENT_DIR", "training_data_segments"),
+    flush_size=int(os.environ.get("TRAINING_FLUSH_SIZE", 100)),
+    flush_interval=float(os.environ.get("TRAINING_FLUSH_INTERVAL", 2.0)),
+    rotate_bytes=int(os.environ.get("TRAINING_ROTATE_BYTES", 8 * 1024 * 1024)),
+    rotate_interval=float(os.environ.get("TRAINING_ROTATE_INTERVAL", 3600)),
+)
+
+
 def log_reading_for_training(interpretation_text, chart_date, fol_hits_count):
     training_data = {
         "timestamp": datetime.now().isoformat(),
@@ -423,59 +487,178 @@ def log_reading_for_training(interpretation_text, chart_date, fol_hits_count):
         "interpretation": interpretation_text,
     }
     
-    with open("training_data.jsonl", "a") as f:
-        f.write(json.dumps(training_data) + "\n")
+    TRAINING_LOG.write(training_data)
     
     logger.info(f"Logged training data: {fol_hits_count} FOL hits")
 
 
+SERVER_TIMING = os.environ.get("SERVER_TIMING", "").lower() in ("1", "true", "yes")
+
+REQUEST_SECONDS = metrics.REGISTRY.histogram(
+    "soultether_request_seconds",
+    "Request latency by endpoint (streamed bodies excluded)",
+    labels=("endpoint", "method", "status"),
+)
+CACHE_REQUESTS = metrics.REGISTRY.counter(
+    "soultether_cache_requests_total",
+    "Cache lookups by result",
+    labels=("cache", "result"),
+)
+CACHE_ENTRIES = metrics.REGISTRY.gauge(
+    "soultether_cache_entries",
+    "Entries held in the in-process cache",
+    labels=("cache",),
+)
+
+
+def _llm_cache():
+    return _llm_interpreter.cache if _llm_interpreter is not None else None
+
+
+def collect_cache_metrics():
+    caches = [("geocode", GEOCODE_CACHE), ("chart", CHART_CACHE)]
+    if _llm_cache() is not None:
+        caches.append(("llm", _llm_cache()))
+    for name, cache in caches:
+        stats = cache.stats()
+        CACHE_REQUESTS.set_total(stats["memory_hits"], cache=name, result="memory_hit")
+        CACHE_REQUESTS.set_total(stats["disk_hits"], cache=name, result="disk_hit")
+        CACHE_REQUESTS.set_total(stats["misses"], cache=name, result="miss")
+        CACHE_ENTRIES.set(stats["memory_size"], cache=name)
+    
+    local = gazetteer.get_gazetteer()
+    if local is not None:
+        CACHE_REQUESTS.set_total(local.hits, cache="gazetteer", result="memory_hit")
+        CACHE_REQUESTS.set_total(local.misses, cache="gazetteer", result="miss")
+
+
+metrics.REGISTRY.register_collector(collect_cache_metrics)
+
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+    if SERVER_TIMING:
+        metrics.start_spans()
+
+
+@app.after_request
+def record_request_timing(response):
+    started = g.pop("request_started", None)
+    if started is not None:
+        elapsed = time.perf_counter() - started
+        REQUEST_SECONDS.observe(
+            elapsed,
+            endpoint=request.endpoint or "unknown",
+            method=request.method,
+            status=response.status_code,
+        )
+        if SERVER_TIMING:
+            spans = metrics.stop_spans()
+            spans.append(("total", elapsed))
+            response.headers["Server-Timing"] = metrics.server_timing(spans)
+    return response
+
+
+@app.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    return Response(metrics.REGISTRY.render(), mimetype="text/plain; version=0.0.4")
+
+
 @app.route('/health', methods=['GET'])
 def health():
     return jsonify({"status": "ok", "service": "SoulTether API"}), 200
 
 
+def _admin_authorized():
+    token = os.environ.get("ADMIN_TOKEN")
+    return not token or request.headers.get("X-Admin-Token") == token
+
+
+@app.route('/admin/cache_stats', methods=['GET'])
+def cache_stats():
+    if not _admin_authorized():
+        return jsonify({"success": False, "error": "Forbidden"}), 403
+    local = gazetteer.get_gazetteer()
+    return jsonify({
+        "geocode": GEOCODE_CACHE.stats(),
+        "chart": CHART_CACHE.stats(),
+        "gazetteer": local.stats() if local else None,
+        "training_log": TRAINING_LOG.stats(),
+        "llm": _llm_cache().stats() if _llm_cache() is not None else None,
+        "llm_jobs": LLM_JOBS.stats(),
+        "http": http_pool.stats(),
+        "ollama": _llm_interpreter.health.stats() if _llm_interpreter is not None else None,
+    }), 200
+
+
+def parse_birth_datetime(data):
+    date_str = data.get('birth_date')
+    hour = int(data.get('hour', 12))
+    minute = int(data.get('minute', 0))
+    is_am = data.get('is_am', True)
+    
+    if hour <= 12:
+        if not is_am and hour != 12:
+            hour += 12
+        elif is_am and hour == 12:
+            hour = 0
+    
+    return datetime.strptime(f"{date_str} {hour:02d}:{minute:02d}", "%Y-%m-%d %H:%M")
+
+
+def compute_chart(dt, lat, lon, location):
+    with metrics.timed("get_full_chart"):
+        chart = get_full_chart(dt, lat, lon)
+    chart["location_name"] = location
+    
+    with metrics.timed("calculate_fol"):
+        hits = calculate_fol(chart, orb_threshold=2.0)
+    
+    return chart, hits
+
+
+def summarize_chart(chart, hits):
+    return {
+        "birth": chart['birth'],
+        "location": chart['location_name'],
+        "coordinates": {"lat": chart['lat'], "lon": chart['lon']},
+        "ascendant": chart['asc'],
+        "midheaven": chart['mc'],
+        "planets": chart['planets'],
+        "fol_hits": len(hits),
+    }
+
+
+def compute_reading(dt, lat, lon, location):
+    chart, hits = compute_chart(dt, lat, lon, location)
+    
+    with metrics.timed("generate_reading"):
+        reading = generate_reading(hits, chart)
+    
+    return {
+        "reading": reading,
+        "chart_data": summarize_chart(chart, hits),
+    }
+
+
 @app.route('/calculate_reading', methods=['POST'])
 def calculate_reading():
     try:
         data = request.get_json()
         
-        date_str = data.get('birth_date')
-        hour = int(data.get('hour', 12))
-        minute = int(data.get('minute', 0))
-        is_am = data.get('is_am', True)
+        dt = parse_birth_datetime(data)
         location = data.get('location')
         
-        if hour <= 12:
-            if not is_am and hour != 12:
-                hour += 12
-            elif is_am and hour == 12:
-                hour = 0
-        
-        dt = datetime.strptime(f"{date_str} {hour:02d}:{minute:02d}", "%Y-%m-%d %H:%M")
-        
-        lat, lon = geocode_location(location)
-        
-        chart = get_full_chart(dt, lat, lon)
-        chart["location_name"] = location
+        with metrics.timed("geocode"):
+            lat, lon = geocode_location(location)
         
-        hits = calculate_fol(chart, orb_threshold=2.0)
-        reading = generate_reading(hits, chart)
+        result = compute_reading(dt, lat, lon, location)
         
-        log_reading_for_training(reading, date_str, len(hits))
+        with metrics.timed("log"):
+            log_reading_for_training(result["reading"], data.get('birth_date'), result["chart_data"]["fol_hits"])
         
-        return jsonify({
-            "success": True,
-            "reading": reading,
-            "chart_data": {
-                "birth": chart['birth'],
-                "location": location,
-                "coordinates": {"lat": lat, "lon": lon},
-                "ascendant": chart['asc'],
-                "midheaven": chart['mc'],
-                "planets": chart['planets'],
-                "fol_hits": len(hits),
-            }
-        }), 200
+        return jsonify({"success": True, **result}), 200
     
     except Exception as e:
         logger.error(f"Error calculating reading: {str(e)}")
@@ -485,5 +668,297 @@ def calculate_reading():
         }), 400
 
 
+BATCH_MAX_SUBJECTS = int(os.environ.get("BATCH_MAX_SUBJECTS", 1000))
+BATCH_PROCESSES = int(os.environ.get("BATCH_PROCESSES", os.cpu_count() or 1))
+BATCH_GEOCODE_THREADS = int(os.environ.get("BATCH_GEOCODE_THREADS", 8))
+
+_chart_pool = None
+_chart_pool_lock = threading.Lock()
+
+
+def get_chart_pool():
+    # swisseph keeps global state, so batch charts run in separate processes.
+    # They are started by a forkserver rather than forked from this worker,
+    # whose other threads may hold locks (caches, metrics, logging) that
+    # would stay locked forever in a forked child.
+    global _chart_pool
+    with _chart_pool_lock:
+        if _chart_pool is None:
+            _chart_pool = ProcessPoolExecutor(
+                max_workers=BATCH_PROCESSES,
+                mp_context=multiprocessing.get_context("forkserver"),
+            )
+        return _chart_pool
+
+
+def reset_chart_pool():
+    global _chart_pool
+    with _chart_pool_lock:
+        if _chart_pool is not None:
+            _chart_pool.shutdown(wait=False, cancel_futures=True)
+        _chart_pool = None
+
+
+def compute_batch_reading(dt, lat, lon, location):
+    """compute_reading() in a pool process. Stage timings are returned with
+    the result, since metrics recorded in the child never reach /metrics."""
+    metrics.start_spans()
+    try:
+        return compute_reading(dt, lat, lon, location), metrics.stop_spans()
+    except Exception:
+        metrics.stop_spans()
+        raise
+
+
+def geocode_unique(locations):
+    """Geocodes each distinct location once. Returns {normalized: (lat, lon) or ValueError}."""
+    unique = {}
+    for location in locations:
+        unique.setdefault(normalize_location(location), location)
+    
+    def resolve(location):
+        try:
+            return geocode_location(location)
+        except Exception as e:
+            return e
+    
+    with ThreadPoolExecutor(max_workers=max(1, min(BATCH_GEOCODE_THREADS, len(unique)))) as pool:
+        resolved = pool.map(resolve, unique.values())
+        return dict(zip(unique.keys(), resolved))
+
+
+def stream_batch_readings(subjects):
+    pending = {}
+    parsed = {}
+    
+    for index, subject in enumerate(subjects):
+        try:
+            if not isinstance(subject, dict):
+                raise ValueError("Each subject must be an object")
+            parsed[index] = (parse_birth_datetime(subject), subject.get('location'), subject.get('birth_date'))
+        except Exception as e:
+            yield json.dumps({"index": index, "success": False, "error": str(e)}) + "\n"
+    
+    with metrics.timed("batch_geocode"):
+        coordinates = geocode_unique(location for _, location, _ in parsed.values()) if parsed else {}
+    pool = get_chart_pool()
+    
+    for index, (dt, location, date_str) in parsed.items():
+        resolved = coordinates[normalize_location(location)]
+        if isinstance(resolved, Exception):
+            yield json.dumps({"index": index, "success": False, "error": str(resolved)}) + "\n"
+            continue
+        lat, lon = resolved
+        try:
+            future = pool.submit(compute_batch_reading, dt, lat, lon, location)
+        except BrokenProcessPool as e:
+            reset_chart_pool()
+            pool = get_chart_pool()
+            yield json.dumps({"index": index, "success": False, "error": f"Chart worker failed: {e}"}) + "\n"
+            continue
+        pending[future] = (index, date_str)
+    
+    for future in as_completed(pending):
+        index, date_str = pending[future]
+        try:
+            result, spans = future.result()
+        except BrokenProcessPool as e:
+            reset_chart_pool()
+            yield json.dumps({"index": index, "success": False, "error": f"Chart worker failed: {e}"}) + "\n"
+            continue
+        except Exception as e:
+            yield json.dumps({"index": index, "success": False, "error": str(e)}) + "\n"
+            continue
+        
+        metrics.record_spans(spans)
+        with metrics.timed("log"):
+            log_reading_for_training(result["reading"], date_str, result["chart_data"]["fol_hits"])
+        yield json.dumps({"index": index, "success": True, **result}) + "\n"
+
+
+@app.route('/calculate_readings', methods=['POST'])
+def calculate_readings():
+    data = request.get_json(silent=True)
+    subjects = data.get('subjects') if isinstance(data, dict) else data
+    
+    if not isinstance(subjects, list) or not subjects:
+        return jsonify({"success": False, "error": "Expected a non-empty 'subjects' list"}), 400
+    
+    if len(subjects) > BATCH_MAX_SUBJECTS:
+        return jsonify({
+            "success": False,
+            "error": f"Too many subjects ({len(subjects)}); the limit is {BATCH_MAX_SUBJECTS}",
+        }), 400
+    
+    return Response(
+        stream_with_context(stream_batch_readings(subjects)),
+        mimetype="application/x-ndjson",
+    )
+
+
+_llm_interpreter = None
+_llm_interpreter_lock = threading.Lock()
+
+
+def get_llm_interpreter():
+    global _llm_interpreter
+    with _llm_interpreter_lock:
+        if _llm_interpreter is None:
+            from llm_interpreter import AstrologyLLMInterpreter
+            _llm_interpreter = AstrologyLLMInterpreter(
+                model_name=os.environ.get("LLM_MODEL", "mixtral"),
+                ollama_url=os.environ.get("OLLAMA_URL", "http://localhost:11434"),
+            )
+        return _llm_interpreter
+
+
+def sse_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def stream_interpretation(chart, hits):
+    from llm_interpreter import LLMStreamError
+    
+    # The chart goes out before the model is even contacted, so the client
+    # has something to render immediately
+    yield sse_event("chart", summarize_chart(chart, hits))
+    
+    try:
+        chunks = get_llm_interpreter().interpret_chart_stream(chart, hits)
+        if chunks is None:
+            yield sse_event("fallback", {"reading": generate_reading(hits, chart)})
+            return
+        
+        for text in chunks:
+            yield sse_event("token", {"text": text})
+        yield sse_event("done", {})
+    
+    except LLMStreamError as e:
+        logger.error(f"LLM stream failed: {str(e)}")
+        yield sse_event("error", {"error": str(e), "reading": generate_reading(hits, chart)})
+    except Exception as e:
+        # The chart event has gone out, so this can't become an HTTP error
+        logger.error(f"LLM stream failed unexpectedly: {str(e)}")
+        yield sse_event("error", {"error": "Interpretation failed", "reading": generate_reading(hits, chart)})
+
+
+@app.route('/interpret_stream', methods=['POST'])
+def interpret_stream():
+    try:
+        data = request.get_json()
+        
+        dt = parse_birth_datetime(data)
+        location = data.get('location')
+        
+        with metrics.timed("geocode"):
+            lat, lon = geocode_location(location)
+        
+        chart, hits = compute_chart(dt, lat, lon, location)
+    
+    except Exception as e:
+        logger.error(f"Error preparing interpretation: {str(e)}")
+        return jsonify({"success": False, "error": str(e)}), 400
+    
+    return Response(
+        stream_with_context(stream_interpretation(chart, hits)),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def run_interpretation_job(payload):
+    chart, hits = compute_chart(
+        datetime.fromisoformat(payload["datetime"]),
+        payload["lat"],
+        payload["lon"],
+        payload["location"],
+    )
+    
+    reading = get_llm_interpreter().interpret_chart(chart, hits)
+    source = "llm"
+    if reading is None:
+        with metrics.timed("generate_reading"):
+            reading = generate_reading(hits, chart)
+        source = "fallback"
+    
+    return {"reading": reading, "source": source, "chart_data": summarize_chart(chart, hits)}
+
+
+LLM_JOBS = llm_jobs.JobQueue(
+    os.environ.get("LLM_JOBS_DB", "soultether_jobs.sqlite3"),
+    run_interpretation_job,
+    concurrency=int(os.environ.get("LLM_JOB_CONCURRENCY", 1)),
+    max_depth=int(os.environ.get("LLM_JOB_MAX_QUEUE", 100)),
+    result_ttl=float(os.environ.get("LLM_JOB_RESULT_TTL", 3600)),
+)
+
+
+@app.route('/interpretations', methods=['POST'])
+def submit_interpretation():
+    try:
+        data = request.get_json()
+        
+        dt = parse_birth_datetime(data)
+        location = data.get('location')
+        
+        with metrics.timed("geocode"):
+            lat, lon = geocode_location(location)
+        
+        job_id = LLM_JOBS.submit(
+            {"datetime": dt.isoformat(), "lat": lat, "lon": lon, "location": location},
+            priority=data.get('priority', 'normal'),
+        )
+    
+    except llm_jobs.QueueFull as e:
+        response = jsonify({"success": False, "error": str(e)})
+        response.headers["Retry-After"] = "30"
+        return response, 429
+    except Exception as e:
+        logger.error(f"Error queueing interpretation: {str(e)}")
+        return jsonify({"success": False, "error": str(e)}), 400
+    
+    return jsonify({"success": True, "job_id": job_id, "status": llm_jobs.QUEUED}), 202
+
+
+@app.route('/interpretations/<job_id>', methods=['GET'])
+def get_interpretation(job_id):
+    job = LLM_JOBS.get(job_id)
+    if job is None:
+        return jsonify({"success": False, "error": "Unknown interpretation job"}), 404
+    return jsonify({"success": True, **job}), 200
+
+
+FOL_TIMELINE_MAX_DAYS = int(os.environ.get("FOL_TIMELINE_MAX_DAYS", 3660))
+
+
+@app.route('/fol_timeline', methods=['POST'])
+def fol_timeline_endpoint():
+    if fol_timeline is None:
+        return jsonify({"success": False, "error": "FOL timeline is not available"}), 503
+    
+    try:
+        data = request.get_json(silent=True) or {}
+        start = datetime.fromisoformat(data['start'])
+        end = datetime.fromisoformat(data['end'])
+        bodies = data.get('bodies') or None
+        orb = float(data.get('orb', 2.0))
+        
+        if (end - start).days > FOL_TIMELINE_MAX_DAYS:
+            raise ValueError(f"Range too long; the limit is {FOL_TIMELINE_MAX_DAYS} days")
+        unknown = [body for body in bodies or [] if body not in fol_timeline.BODIES]
+        if unknown:
+            raise ValueError(f"Unknown bodies: {', '.join(unknown)}")
+        
+        with _swe_lock, metrics.timed("fol_timeline"):
+            events = list(fol_timeline.fol_timeline(start, end, bodies=bodies, grid=data.get('grid'), orb=orb))
+        
+        return jsonify({"success": True, "events": events}), 200
+    
+    except KeyError as e:
+        return jsonify({"success": False, "error": f"Missing field: {e.args[0]}"}), 400
+    except (TypeError, ValueError) as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+
+
 if __name__ == '__main__':
     app.run(debug=False, host='0.0.0.0', port=5000)
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Build the offline gazetteer index (gazetteer.idx) used by geocode_location().
+
+Accepts either a GeoNames cities dump (e.g. cities15000.txt, tab separated,
+no header) or a CSV with a header row containing:
+    name, alternate_names, country_code, country, admin1, admin1_name,
+    lat, lon, population
+
+Examples:
+    python build_gazetteer.py cities15000.txt --countries countryInfo.txt \\
+        --admin1 admin1CodesASCII.txt
+    python build_gazetteer.py my_cities.csv -o gazetteer.idx
+"""
+
+import argparse
+import csv
+import os
+import sys
+
+from gazetteer import HEADER, KEY, MAGIC, PLACE, QUALIFIER_SEP, STRLEN, VERSION, normalize
+
+
+def read_geonames(path, countries, admin1_names):
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            cols = line.rstrip("\n").split("\t")
+            if len(cols) < 15:
+                continue
+            country_code = cols[8]
+            admin1 = cols[10]
+            yield {
+                "name": cols[1],
+                "alternate_names": [cols[2]] + cols[3].split(","),
+                "country_code": country_code,
+                "country": countries.get(country_code, ""),
+                "admin1": admin1,
+                "admin1_name": admin1_names.get(f"{country_code}.{admin1}", ""),
+                "lat": float(cols[4]),
+                "lon": float(cols[5]),
+                "population": int(cols[14] or 0),
+            }
+
+
+def read_csv(path):
+    with open(path, encoding="utf-8", newline="") as f:
+        for row in csv.DictReader(f):
+            alternates = row.get("alternate_names") or row.get("alternatenames") or ""
+            yield {
+                "name": row["name"],
+                "alternate_names": alternates.replace(";", ",").split(","),
+                "country_code": row.get("country_code", ""),
+                "country": row.get("country", ""),
+                "admin1": row.get("admin1", ""),
+                "admin1_name": row.get("admin1_name", ""),
+                "lat": float(row.get("lat") or row["latitude"]),
+                "lon": float(row.get("lon") or row["longitude"]),
+                "population": int(float(row.get("population") or 0)),
+            }
+
+
+def read_code_names(path, code_col, name_col):
+    names = {}
+    if not path:
+        return names
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.startswith("#"):
+                continue
+            cols = line.rstrip("\n").split("\t")
+            if len(cols) > max(code_col, name_col):
+                names[cols[code_col]] = cols[name_col]
+    return names
+
+
+# Longest string the index's length prefix can hold
+MAX_STRING_BYTES = 2 ** (8 * STRLEN.size) - 1
+
+
+def encode_string(text):
+    """UTF-8 bytes of text, truncated on a character boundary to fit."""
+    data = text.encode("utf-8")
+    if len(data) <= MAX_STRING_BYTES:
+        return data
+    print(f"⚠ Truncating a {len(data)} byte string starting {text[:40]!r}", file=sys.stderr)
+    return data[:MAX_STRING_BYTES].decode("utf-8", "ignore").encode("utf-8")
+
+
+def build(places, output, min_population=0, max_alternates=25):
+    strings = bytearray()
+    interned = {}
+
+    def ref(text):
+        if text not in interned:
+            data = encode_string(text)
+            interned[text] = len(strings)
+            strings.extend(STRLEN.pack(len(data)))
+            strings.extend(data)
+        return interned[text]
+
+    place_records = bytearray()
+    keys = set()
+    n_places = 0
+
+    for place in places:
+        if place["population"] < min_population:
+            continue
+
+        qualifiers = QUALIFIER_SEP.join(
+            place[k] for k in ("country_code", "country", "admin1", "admin1_name")
+        )
+        place_records.extend(PLACE.pack(
+            place["lat"],
+            place["lon"],
+            min(place["population"], 0xFFFFFFFF),
+            ref(place["name"]),
+            ref(qualifiers),
+        ))
+
+        names = [place["name"]]
+        names += [n for n in place["alternate_names"] if n and not any(c.isdigit() for c in n)][:max_alternates]
+        for name in names:
+            key = normalize(name).split(",")[0]
+            if len(key) > 1:
+                keys.add((key.encode("utf-8"), n_places))
+
+        n_places += 1
+
+    key_records = bytearray()
+    for key, place_index in sorted(keys):
+        key_records.extend(KEY.pack(ref(key.decode("utf-8")), place_index))
+
+    places_offset = HEADER.size
+    keys_offset = places_offset + len(place_records)
+    strings_offset = keys_offset + len(key_records)
+
+    tmp_path = f"{output}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, n_places, len(keys), places_offset, keys_offset, strings_offset))
+        f.write(place_records)
+        f.write(key_records)
+        f.write(strings)
+    os.replace(tmp_path, output)
+
+    return n_places, len(keys)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the SoulTether offline gazetteer index")
+    parser.add_argument("source", help="GeoNames cities dump (.txt/.tsv) or CSV with header")
+    parser.add_argument("-o", "--output", default="gazetteer.idx")
+    parser.add_argument("--countries", help="GeoNames countryInfo.txt for country names")
+    parser.add_argument("--admin1", help="GeoNames admin1CodesASCII.txt for region names")
+    parser.add_argument("--min-population", type=int, default=0)
+    parser.add_argument("--max-alternates", type=int, default=25)
+    args = parser.parse_args()
+
+    if args.source.endswith((".txt", ".tsv")):
+        countries = read_code_names(args.countries, 0, 4)
+        admin1_names = read_code_names(args.admin1, 0, 2)
+        places = read_geonames(args.source, countries, admin1_names)
+    else:
+        places = read_csv(args.source)
+
+    n_places, n_keys = build(places, args.output, args.min_population, args.max_alternates)
+    size_kb = os.path.getsize(args.output) / 1024
+    print(f"✓ Wrote {args.output}: {n_places} places, {n_keys} keys ({size_kb:.0f} KB)")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,7 +5,7 @@ package.name = soultether
 package.domain = org.soultether
 
 source.dir = .
-source.include_exts = py,png,jpg,kv,atlas,txt
+source.include_exts = py,png,jpg,kv,atlas,txt,idx
 
 version = 1.0.0
 
@@ -0,0 +1,241 @@
+"""
+Array-based chart math shared by app.py and soultether_mobile.py.
+
+Houses are assigned by rotating the cusps into ascending order once per
+chart and binary-searching each body (or comparing all bodies of many charts
+at once with NumPy).
+
+Aspects are found by building the pairwise angular-distance matrix once and
+testing every aspect angle/orb against it with array operations. Results use
+the same dict structure (and the same first-match aspect order) as the
+original per-pair loop. NumPy is optional; without it the plain loop is used.
+"""
+
+import bisect
+import math
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Tested in this order; the first aspect within orb wins
+ASPECTS = [
+    (0, "Conjunction", 8.0),
+    (60, "Sextile", 6.0),
+    (90, "Square", 8.0),
+    (120, "Trine", 8.0),
+    (180, "Opposition", 8.0),
+    (150, "Quincunx", 3.0),
+]
+
+VECTORIZE_MIN_BODIES = 24
+
+
+def _aspect_dict(name1, name2, aspect, orb_diff, diff):
+    angle, aspect_name, _ = aspect
+    return {
+        "object1": name1,
+        "object2": name2,
+        "type": aspect_name,
+        "orb": orb_diff if diff < 180 else -orb_diff,
+        "angle": angle,
+    }
+
+
+def _match_pair(lon1, lon2, aspects):
+    diff = abs(lon1 - lon2)
+    if diff > 180:
+        diff = 360 - diff
+    for index, (angle, _, max_orb) in enumerate(aspects):
+        orb_diff = abs(diff - angle)
+        if orb_diff <= max_orb:
+            return index, orb_diff, diff
+    return None
+
+
+def match_aspects(lons_a, lons_b, aspects=ASPECTS):
+    """Matches every longitude in lons_a against every one in lons_b.
+
+    Accepts (..., P) and (..., Q) shaped arrays (e.g. N charts at once as
+    (N, P)) and returns (aspect_index, orb_diff, diff) arrays of shape
+    (..., P, Q); aspect_index is -1 where no aspect is within orb.
+    """
+    lons_a = np.asarray(lons_a, dtype=float)
+    lons_b = np.asarray(lons_b, dtype=float)
+
+    diff = np.abs(lons_a[..., :, None] - lons_b[..., None, :])
+    diff = np.where(diff > 180, 360 - diff, diff)
+
+    index = np.full(diff.shape, -1, dtype=np.int8)
+    orb_diff = np.zeros(diff.shape)
+    for i, (angle, _, max_orb) in enumerate(aspects):
+        candidate = np.abs(diff - angle)
+        hit = (candidate <= max_orb) & (index < 0)
+        index[hit] = i
+        orb_diff[hit] = candidate[hit]
+
+    return index, orb_diff, diff
+
+
+def _collect(names_a, names_b, aspects, matched, index, orb_diff, diff, per_chart=False):
+    """Builds aspect dicts for the (chart, row, col) positions set in matched."""
+    positions = np.nonzero(matched)
+    rows, cols = positions[-2].tolist(), positions[-1].tolist()
+    found = zip(
+        rows,
+        cols,
+        index[positions].tolist(),
+        orb_diff[positions].tolist(),
+        diff[positions].tolist(),
+    )
+    result = [
+        _aspect_dict(names_a[i], names_b[j], aspects[k], orb, d)
+        for i, j, k, orb, d in found
+    ]
+    if not per_chart:
+        return result
+
+    charts = [[] for _ in range(matched.shape[0])]
+    for n, aspect in zip(positions[0].tolist(), result):
+        charts[n].append(aspect)
+    return charts
+
+
+def _loop_aspects(names_a, lons_a, names_b, lons_b, aspects, pairs_only):
+    result = []
+    for i, name1 in enumerate(names_a):
+        for j in range(i + 1 if pairs_only else 0, len(names_b)):
+            match = _match_pair(lons_a[i], lons_b[j], aspects)
+            if match is not None:
+                result.append(_aspect_dict(name1, names_b[j], aspects[match[0]], match[1], match[2]))
+    return result
+
+
+def calculate_aspects(planet_data, aspects=ASPECTS):
+    """Aspects between every pair of bodies in a chart's planet dict."""
+    names = list(planet_data)
+    lons = [planet_data[name]["lon"] for name in names]
+
+    # Array setup costs more than it saves on a single ~11 body chart
+    if np is None or len(names) < VECTORIZE_MIN_BODIES:
+        return _loop_aspects(names, lons, names, lons, aspects, pairs_only=True)
+
+    index, orb_diff, diff = match_aspects(lons, lons, aspects)
+    return _collect(names, names, aspects, np.triu(index >= 0, k=1), index, orb_diff, diff)
+
+
+def calculate_aspects_batch(names, lons, aspects=ASPECTS):
+    """Aspects for N charts that share the same body order.
+
+    lons is an (N, P) array of longitudes, one row per chart, with columns
+    in `names` order. Returns one aspect list per chart.
+    """
+    if np is None:
+        return [_loop_aspects(names, row, names, row, aspects, pairs_only=True) for row in lons]
+
+    index, orb_diff, diff = match_aspects(lons, lons, aspects)
+    upper = np.triu(np.ones(index.shape[-2:], dtype=bool), k=1)
+    return _collect(names, names, aspects, (index >= 0) & upper, index, orb_diff, diff, per_chart=True)
+
+
+def calculate_synastry_aspects(planet_data_a, planet_data_b, aspects=ASPECTS):
+    """Aspects from every body in chart A to every body in chart B."""
+    names_a = list(planet_data_a)
+    names_b = list(planet_data_b)
+    lons_a = [planet_data_a[name]["lon"] for name in names_a]
+    lons_b = [planet_data_b[name]["lon"] for name in names_b]
+
+    if np is None:
+        return _loop_aspects(names_a, lons_a, names_b, lons_b, aspects, pairs_only=False)
+
+    index, orb_diff, diff = match_aspects(lons_a, lons_b, aspects)
+    return _collect(names_a, names_b, aspects, index >= 0, index, orb_diff, diff)
+
+
+def house_by_scan(lon, cusps):
+    """The original linear scan, used when cusps are not in zodiac order."""
+    lon = lon % 360
+    for i in range(12):
+        cusp_start = cusps[i] % 360
+        cusp_end = cusps[(i + 1) % 12] % 360
+        if cusp_start < cusp_end:
+            if cusp_start <= lon < cusp_end:
+                return i + 1
+        else:
+            if lon >= cusp_start or lon < cusp_end:
+                return i + 1
+    return 1
+
+
+class HouseIndex:
+    """House lookup for one chart's 12 cusps.
+
+    The cusps are rotated so the smallest comes first, giving an ascending
+    array to bisect; a longitude below every cusp belongs to the house of the
+    largest one.
+    """
+
+    def __init__(self, cusps):
+        self.cusps = list(cusps[:12])
+        wrapped = [cusp % 360 for cusp in self.cusps]
+        self._start = min(range(12), key=wrapped.__getitem__)
+        self._sorted = wrapped[self._start:] + wrapped[:self._start]
+        self.monotonic = all(a < b for a, b in zip(self._sorted, self._sorted[1:]))
+
+    def house(self, lon):
+        if not self.monotonic:
+            return house_by_scan(lon, self.cusps)
+        position = bisect.bisect_right(self._sorted, lon % 360) - 1
+        return (position + self._start) % 12 + 1
+
+    def houses(self, lons):
+        if np is None or not self.monotonic:
+            return [self.house(lon) for lon in lons]
+        positions = np.searchsorted(self._sorted, np.mod(np.asarray(lons, dtype=float), 360), side="right") - 1
+        return ((positions + self._start) % 12 + 1).tolist()
+
+
+def assign_houses_batch(lons, cusps):
+    """Houses for N charts at once: lons is (N, P), cusps is (N, 12).
+    Returns an (N, P) array of house numbers (a list of lists without NumPy)."""
+    if np is None:
+        return [HouseIndex(row_cusps).houses(row) for row, row_cusps in zip(lons, cusps)]
+
+    lons = np.mod(np.asarray(lons, dtype=float), 360)
+    wrapped = np.mod(np.asarray(cusps, dtype=float)[:, :12], 360)
+    order = np.argsort(wrapped, axis=1, kind="stable")
+    ordered = np.take_along_axis(wrapped, order, axis=1)
+
+    # Bodies below the first sorted cusp wrap to the last one
+    positions = (lons[:, :, None] >= ordered[:, None, :]).sum(axis=2) - 1
+    houses = np.take_along_axis(order, positions % 12, axis=1) + 1
+
+    # Rows whose cusps are not a rotation of an ascending sequence use the scan
+    cyclic = np.all(order == (order[:, :1] + np.arange(12)) % 12, axis=1)
+    monotonic = cyclic & np.all(np.diff(ordered, axis=1) > 0, axis=1)
+    for n in np.nonzero(~monotonic)[0].tolist():
+        houses[n] = [house_by_scan(lon, cusps[n]) for lon in lons[n].tolist()]
+    return houses
+
+
+def ascendant_midheaven(ramc, lat, obliquity):
+    """Ascendant and MC (ecliptic longitudes, degrees) from the local sidereal
+    time as right ascension of the MC, geographic latitude and obliquity."""
+    ramc, lat, eps = math.radians(ramc), math.radians(lat), math.radians(obliquity)
+    mc = math.degrees(math.atan2(math.sin(ramc), math.cos(ramc) * math.cos(eps))) % 360
+    asc = math.degrees(math.atan2(
+        math.cos(ramc),
+        -(math.sin(ramc) * math.cos(eps) + math.tan(lat) * math.sin(eps)),
+    )) % 360
+    return asc, mc
+
+
+def porphyry_cusps(asc, mc):
+    """Twelve cusps from trisecting each quadrant between the angles."""
+    angles = [asc, (mc + 180) % 360, (asc + 180) % 360, mc]
+    cusps = []
+    for i, start in enumerate(angles):
+        arc = (angles[(i + 1) % 4] - start) % 360
+        cusps.extend([start, (start + arc / 3) % 360, (start + 2 * arc / 3) % 360])
+    return cusps
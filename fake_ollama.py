@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+A stand-in for Ollama's HTTP API, for load testing without a GPU.
+
+Implements GET /api/tags and POST /api/generate (streaming NDJSON and
+single-response). Each generation waits `--latency` seconds (prompt
+processing), then emits tokens at `--tokens-per-second`. At most
+`--parallel` generations run at once; the rest queue, as they do on a real
+single-GPU Ollama. Failures can be injected as HTTP 500s or as streams cut
+off part way through.
+
+Examples:
+    python fake_ollama.py
+    python fake_ollama.py --port 11500 --latency 1.5 --tokens-per-second 30 \\
+        --parallel 2 --failure-rate 0.05 --drop-rate 0.02
+
+GET /fake/stats reports request counts, for checking what reached the model.
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+WORDS = (
+    "the stars align as venus crosses your ascendant and the flower of life "
+    "turns its sacred geometry toward the soul remembering an ancient pattern "
+    "of love will courage and quiet transformation through every house"
+).split()
+
+
+class FakeOllama:
+    def __init__(self, latency=0.5, tokens_per_second=40.0, tokens=200, parallel=1,
+                 failure_rate=0.0, drop_rate=0.0, models=("mixtral",)):
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.tokens = tokens
+        self.failure_rate = failure_rate
+        self.drop_rate = drop_rate
+        self.models = list(models)
+        self.slots = threading.BoundedSemaphore(parallel)
+
+        self._lock = threading.Lock()
+        self.stats = {"tags": 0, "generate": 0, "streamed": 0, "failed": 0, "dropped": 0, "active": 0, "waiting": 0}
+
+    def count(self, name, amount=1):
+        with self._lock:
+            self.stats[name] += amount
+
+    def tokens_for(self, prompt, limit):
+        # Deterministic per prompt, like a model run at a fixed seed
+        rng = random.Random(hashlib.md5(prompt.encode()).hexdigest())
+        return [rng.choice(WORDS) + " " for _ in range(min(self.tokens, limit))]
+
+
+def make_handler(model):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            if self.path == "/api/tags":
+                model.count("tags")
+                self._json(200, {"models": [{"name": name, "model": name} for name in model.models]})
+            elif self.path == "/fake/stats":
+                with model._lock:
+                    self._json(200, dict(model.stats))
+            else:
+                self._json(404, {"error": "not found"})
+
+        def do_POST(self):
+            if self.path != "/api/generate":
+                self._json(404, {"error": "not found"})
+                return
+
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            model.count("generate")
+            if random.random() < model.failure_rate:
+                model.count("failed")
+                self._json(500, {"error": "injected failure"})
+                return
+
+            limit = body.get("num_predict") or body.get("options", {}).get("num_predict") or model.tokens
+            tokens = model.tokens_for(body.get("prompt", ""), limit)
+
+            model.count("waiting")
+            with model.slots:
+                model.count("waiting", -1)
+                model.count("active")
+                try:
+                    time.sleep(model.latency)
+                    if body.get("stream", True):
+                        self._stream(body, tokens)
+                    else:
+                        time.sleep(len(tokens) / model.tokens_per_second)
+                        self._json(200, self._final(body, "".join(tokens).strip(), len(tokens)))
+                finally:
+                    model.count("active", -1)
+
+        def _stream(self, body, tokens):
+            model.count("streamed")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+
+            drop_at = random.randrange(len(tokens)) if tokens and random.random() < model.drop_rate else None
+            interval = 1.0 / model.tokens_per_second
+            for i, token in enumerate(tokens):
+                if i == drop_at:
+                    model.count("dropped")
+                    self.close_connection = True
+                    return
+                self._chunk({"model": body.get("model"), "response": token, "done": False})
+                time.sleep(interval)
+            self._chunk(self._final(body, "", len(tokens)))
+            self.wfile.write(b"0\r\n\r\n")
+
+        def _final(self, body, text, count):
+            return {
+                "model": body.get("model"),
+                "response": text,
+                "done": True,
+                "prompt_eval_count": len(body.get("prompt", "")) // 4,
+                "eval_count": count,
+            }
+
+        def _chunk(self, data):
+            line = (json.dumps(data) + "\n").encode()
+            self.wfile.write(f"{len(line):x}\r\n".encode() + line + b"\r\n")
+            self.wfile.flush()
+
+        def _json(self, status, data):
+            payload = json.dumps(data).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+    return Handler
+
+
+def make_server(host="127.0.0.1", port=11434, **options):
+    """Builds the server; options are FakeOllama's arguments."""
+    server = ThreadingHTTPServer((host, port), make_handler(FakeOllama(**options)))
+    server.daemon_threads = True
+    return server
+
+
+def serve(host="127.0.0.1", port=11434, **options):
+    """Starts the server in a background thread and returns it."""
+    server = make_server(host, port, **options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake Ollama server for SoulTether load tests")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11434)
+    parser.add_argument("--latency", type=float, default=0.5, help="seconds before the first token")
+    parser.add_argument("--tokens-per-second", type=float, default=40.0)
+    parser.add_argument("--tokens", type=int, default=200, help="tokens per response (capped by num_predict)")
+    parser.add_argument("--parallel", type=int, default=1, help="generations served at once")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="fraction of generations answered with HTTP 500")
+    parser.add_argument("--drop-rate", type=float, default=0.0, help="fraction of streams cut off part way")
+    parser.add_argument("--model", action="append", dest="models", help="model names for /api/tags")
+    args = parser.parse_args()
+
+    server = make_server(
+        args.host,
+        args.port,
+        latency=args.latency,
+        tokens_per_second=args.tokens_per_second,
+        tokens=args.tokens,
+        parallel=args.parallel,
+        failure_rate=args.failure_rate,
+        drop_rate=args.drop_rate,
+        models=args.models or ["mixtral"],
+    )
+    print(f"Fake Ollama listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
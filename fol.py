@@ -0,0 +1,134 @@
+"""
+Flower of Life node matching.
+
+A grid is a sorted table of node angles, each snapped to the nearest multiple
+of 360/432 degrees (360/19 for the 19-node grid), built once and reused for
+every chart. A single body is matched with bisect over the sorted angles;
+a chart's bodies, and bulk scans over many charts or time steps, are matched
+at once with NumPy when it is installed.
+"""
+
+import bisect
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+DIVISIONS = 432
+INCREMENT = 360.0 / DIVISIONS
+
+# 24 nodes at 15° intervals interleaved with the 7.5° half steps
+FOL_ANGLES = [i * 7.5 for i in range(48)]
+
+# Guards the bisect window against last-bit differences from the exact orb test
+_EPSILON = 1e-9
+
+
+def snap_nodes(angles, divisions=DIVISIONS):
+    """Returns sorted, de-duplicated (snapped_angle, multiple) pairs."""
+    increment = 360.0 / divisions
+    nodes = set()
+    for angle in angles:
+        multiple = round(angle / increment)
+        nodes.add(((multiple % divisions) * increment, multiple % divisions))
+    return sorted(nodes)
+
+
+def angular_distance(lon, node_angle):
+    diff = abs(lon - node_angle)
+    if diff > 180:
+        diff = 360 - diff
+    return diff
+
+
+class FOLGrid:
+    def __init__(self, nodes, name="custom"):
+        self.name = name
+        self.nodes = sorted(nodes)
+        self.angles = [angle for angle, _ in self.nodes]
+        self.multiples = [multiple for _, multiple in self.nodes]
+        self._angles_array = np.array(self.angles, dtype=float) if np is not None else None
+        # Half the narrowest gap between neighbouring nodes: the widest orb
+        # for which no two nodes' orbs overlap (rounded so 360/n/2 still passes
+        # for an n-division grid)
+        following = self.angles[1:] + [angle + 360 for angle in self.angles[:1]]
+        gaps = [b - a for a, b in zip(self.angles, following)]
+        self.max_orb = round(min(gaps, default=360.0) / 2, 9)
+
+    @classmethod
+    def from_angles(cls, angles, divisions=DIVISIONS, name="custom"):
+        return cls(snap_nodes(angles, divisions), name=name)
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def matches(self, lon, orb):
+        """Returns (node_angle, node_multiple, orb) for every node within orb
+        of lon, in ascending node order."""
+        return [(self.angles[i], self.multiples[i], diff) for i, diff in self._match_indexes(lon % 360, orb)]
+
+    def match_many(self, lons, orb):
+        """Matches many longitudes at once, as calculate_fol() does for a
+        chart's bodies. Returns (body_index, node_index, orb) triples ordered
+        by body, then ascending node."""
+        if np is None:
+            return [
+                (body, i, diff)
+                for body, lon in enumerate(lons)
+                for i, diff in self._match_indexes(lon % 360, orb)
+            ]
+
+        lons = np.mod(np.asarray(lons, dtype=float), 360)
+        diff = np.abs(lons[:, None] - self._angles_array[None, :])
+        diff = np.where(diff > 180, 360 - diff, diff)
+        bodies, nodes = np.nonzero(diff <= orb)
+        return list(zip(bodies.tolist(), nodes.tolist(), diff[bodies, nodes].tolist()))
+
+    def _match_indexes(self, lon, orb):
+        indexes = set()
+        for lo, hi in self._windows(lon, orb):
+            indexes.update(range(bisect.bisect_left(self.angles, lo), bisect.bisect_right(self.angles, hi)))
+
+        result = []
+        for i in sorted(indexes):
+            diff = angular_distance(lon, self.angles[i])
+            if diff <= orb:
+                result.append((i, diff))
+        return result
+
+    def _windows(self, lon, orb):
+        lo = lon - orb - _EPSILON
+        hi = lon + orb + _EPSILON
+        yield max(lo, 0.0), min(hi, 360.0)
+        if lo < 0:
+            yield lo + 360, 360.0
+        if hi > 360:
+            yield 0.0, hi - 360
+
+
+GRIDS = {
+    # The original 37-node table (the first 37 half-step angles)
+    "37": FOLGrid.from_angles(FOL_ANGLES[:37], name="37"),
+    "48": FOLGrid.from_angles(FOL_ANGLES, name="48"),
+    "432": FOLGrid.from_angles([i * INCREMENT for i in range(DIVISIONS)], name="432"),
+    # The 19 nodes evenly spaced around the wheel that SETUP.md describes and
+    # prepare_astrology_dataset.py uses (i * 360/19). 360/19 is not a multiple
+    # of 360/432, so these snap to their own division and keep exact angles.
+    "19": FOLGrid.from_angles([i * 360.0 / 19 for i in range(19)], divisions=19, name="19"),
+}
+
+DEFAULT_GRID = "37"
+
+
+def get_grid(grid=None):
+    """Accepts a grid name, a FOLGrid, or an iterable of raw angles."""
+    if grid is None:
+        return GRIDS[DEFAULT_GRID]
+    if isinstance(grid, FOLGrid):
+        return grid
+    if isinstance(grid, str):
+        if grid not in GRIDS:
+            raise ValueError(f"Unknown FOL grid: {grid}")
+        return GRIDS[grid]
+    return FOLGrid.from_angles(grid)
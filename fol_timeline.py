@@ -0,0 +1,242 @@
+"""
+Flower of Life transit timeline: every time a body enters the orb of a node,
+is exact on it, or leaves the orb, within a date range.
+
+Rather than sampling positions every day, each body is stepped coarsely and
+its longitude is only evaluated finely where a crossing is bracketed:
+
+1. Sample the body every STEP_DAYS[body] days (short enough that it cannot
+   station twice, or move more than 180°, between samples).
+2. If the speed changes sign inside a step, locate the station so every
+   sub-interval is monotonic in longitude.
+3. In each monotonic interval, every target angle (node - orb, node,
+   node + orb) lying between the two longitudes is crossed exactly once;
+   refine each crossing with Newton steps on the ephemeris speed, falling
+   back to bisection inside the bracket.
+
+Each body produces a time-ordered generator; heapq.merge combines them into
+one sorted stream.
+"""
+
+import bisect
+import heapq
+from datetime import datetime, timedelta, timezone
+
+import swisseph as swe
+
+import fol
+
+FLAGS = swe.FLG_SWIEPH | swe.FLG_SPEED
+
+BODIES = {
+    "Sun": swe.SUN,
+    "Moon": swe.MOON,
+    "Mercury": swe.MERCURY,
+    "Venus": swe.VENUS,
+    "Mars": swe.MARS,
+    "Jupiter": swe.JUPITER,
+    "Saturn": swe.SATURN,
+    "Uranus": swe.URANUS,
+    "Neptune": swe.NEPTUNE,
+    "Pluto": swe.PLUTO,
+    "North Node": swe.MEAN_NODE,
+}
+
+DEFAULT_BODIES = [name for name in BODIES if name != "North Node"]
+
+# Sampling interval per body, in days. Shorter than half the shortest
+# retrograde period so at most one station falls inside a step.
+STEP_DAYS = {
+    "Sun": 5.0,
+    "Moon": 1.0,
+    "Mercury": 2.0,
+    "Venus": 4.0,
+    "Mars": 4.0,
+    "Jupiter": 8.0,
+    "Saturn": 8.0,
+    "Uranus": 10.0,
+    "Neptune": 10.0,
+    "Pluto": 10.0,
+    "North Node": 10.0,
+}
+
+# Roots are refined to about a tenth of a second
+TIME_TOLERANCE = 1e-6
+
+_JD_UNIX_EPOCH = 2440587.5
+
+
+def to_jd(value):
+    """Accepts a Julian day number or a datetime (naive datetimes are UTC)."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    seconds = value.second + value.microsecond / 1e6
+    hours = value.hour + value.minute / 60.0 + seconds / 3600.0
+    return swe.julday(value.year, value.month, value.day, hours)
+
+
+def from_jd(jd):
+    epoch = datetime(1970, 1, 1, tzinfo=timezone.utc)
+    return epoch + timedelta(days=jd - _JD_UNIX_EPOCH)
+
+
+def _signed(angle):
+    return (angle + 180.0) % 360.0 - 180.0
+
+
+def _targets(grid, orb):
+    """Returns sorted (angle, node_angle, node_multiple, kind) where kind is
+    -1 (lower orb edge), 0 (exact) or 1 (upper orb edge)."""
+    targets = []
+    for node_angle, node_multiple in grid.nodes:
+        targets.append(((node_angle - orb) % 360.0, node_angle, node_multiple, -1))
+        targets.append((node_angle, node_angle, node_multiple, 0))
+        targets.append(((node_angle + orb) % 360.0, node_angle, node_multiple, 1))
+    targets.sort()
+    return targets
+
+
+class _Body:
+    def __init__(self, name):
+        self.name = name
+        self.body = BODIES[name]
+        self.evaluations = 0
+
+    def position(self, jd):
+        self.evaluations += 1
+        values = swe.calc_ut(jd, self.body, FLAGS)[0]
+        return values[0], values[3]
+
+
+def _find_station(body, t0, v0, t1):
+    """Bisects for the time the speed changes sign between t0 and t1."""
+    while t1 - t0 > TIME_TOLERANCE:
+        mid = (t0 + t1) / 2
+        _, v = body.position(mid)
+        if (v > 0) == (v0 > 0):
+            t0 = mid
+        else:
+            t1 = mid
+    return (t0 + t1) / 2
+
+
+def _find_crossing(body, target, t0, t1, direction, guess):
+    """Finds when a body moving monotonically in `direction` passes target
+    between t0 and t1, starting from an interpolated guess: Newton steps on
+    the speed, kept inside the bracket. Returns (jd, lon, speed)."""
+    t = guess
+    for _ in range(60):
+        lon, speed = body.position(t)
+        offset = _signed(lon - target)
+        if offset * direction < 0:
+            t0 = t
+        else:
+            t1 = t
+
+        step = -offset / speed if speed else None
+        if step is not None and abs(step) <= TIME_TOLERANCE:
+            return t, lon, speed
+        if t1 - t0 <= TIME_TOLERANCE:
+            break
+
+        t = t + step if step is not None and t0 < t + step < t1 else (t0 + t1) / 2
+
+    t = (t0 + t1) / 2
+    return (t,) + body.position(t)
+
+
+def _crossed(targets, angles, start, end, direction):
+    """Returns (unwrapped_angle, target) for the targets passed moving from
+    unwrapped longitude start to end, in the order they are passed. Moving
+    forward the interval is (start, end], backward [end, start), so a
+    target sitting exactly on a sample point is counted once."""
+    lo, hi = (start, end) if direction > 0 else (end, start)
+    search = bisect.bisect_right if direction > 0 else bisect.bisect_left
+
+    crossed = []
+    turn = 360.0 * (lo // 360.0)
+    while turn <= hi:
+        for i in range(search(angles, lo - turn), search(angles, hi - turn)):
+            crossed.append((angles[i] + turn, targets[i]))
+        turn += 360.0
+
+    crossed.sort(key=lambda item: item[0], reverse=direction < 0)
+    return crossed
+
+
+def _body_events(name, start_jd, end_jd, targets):
+    body = _Body(name)
+    angles = [target[0] for target in targets]
+    step = STEP_DAYS.get(name, 1.0)
+
+    t0 = start_jd
+    lon0, v0 = body.position(t0)
+
+    while t0 < end_jd:
+        t1 = min(t0 + step, end_jd)
+        lon1, v1 = body.position(t1)
+
+        segments = [(t0, lon0, v0, t1, lon1, v1)]
+        if (v0 > 0) != (v1 > 0) and v0 and v1:
+            ts = _find_station(body, t0, v0, t1)
+            lons, _ = body.position(ts)
+            segments = [(t0, lon0, v0, ts, lons, v0), (ts, lons, v1, t1, lon1, v1)]
+
+        for seg_t0, seg_lon0, seg_v, seg_t1, seg_lon1, _ in segments:
+            direction = 1 if seg_v > 0 else -1
+            start = seg_lon0
+            end = start + _signed(seg_lon1 - seg_lon0)
+            if (end - start) * direction <= 0:
+                continue
+
+            for unwrapped, target in _crossed(targets, angles, start, end, direction):
+                target_angle, node_angle, node_multiple, kind = target
+                guess = seg_t0 + (seg_t1 - seg_t0) * (unwrapped - start) / (end - start)
+                t, lon, speed = _find_crossing(
+                    body, target_angle, seg_t0, seg_t1, direction, guess
+                )
+                if kind == 0:
+                    event = "exact"
+                elif kind * direction < 0:
+                    event = "enter"
+                else:
+                    event = "exit"
+                yield {
+                    "jd": t,
+                    "datetime": from_jd(t).isoformat(),
+                    "body": name,
+                    "event": event,
+                    "node": node_angle,
+                    "node_multiple": node_multiple,
+                    "lon": lon % 360.0,
+                    "speed": speed,
+                    "retrograde": speed < 0,
+                }
+
+        t0, lon0, v0 = t1, lon1, v1
+
+
+def fol_timeline(start, end, bodies=None, grid=None, orb=2.0):
+    """Yields every FOL node event between start and end (datetimes or Julian
+    days), sorted by time. Bodies already inside an orb at `start` only
+    produce events from their next crossing on. Raises ValueError unless
+    0 < orb <= the grid's max_orb."""
+    start_jd = to_jd(start)
+    end_jd = to_jd(end)
+    if end_jd <= start_jd:
+        return iter(())
+
+    fol_grid = fol.get_grid(grid)
+    if not 0 < orb <= fol_grid.max_orb:
+        raise ValueError(
+            f"orb must be more than 0 and at most {fol_grid.max_orb:g} for this grid"
+        )
+
+    targets = _targets(fol_grid, orb)
+    streams = [
+        _body_events(name, start_jd, end_jd, targets)
+        for name in (bodies or DEFAULT_BODIES)
+    ]
+    return heapq.merge(*streams, key=lambda event: event["jd"])
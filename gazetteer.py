@@ -0,0 +1,230 @@
+"""
+Offline gazetteer lookup backed by a compact, memory-mapped index file.
+
+The index is produced by build_gazetteer.py. Every worker maps the same file
+read-only, so the pages are shared through the OS page cache and nothing is
+parsed into Python objects up front.
+
+File layout (little endian):
+    header   <4sIIIIII  magic, version, n_places, n_keys,
+                        places_offset, keys_offset, strings_offset
+    places   <ddIII     lat, lon, population, name_ref, qualifiers_ref
+    keys     <II        key_ref, place_index   (sorted by key bytes)
+    strings  <H + utf-8 length-prefixed strings referenced by *_ref offsets
+
+Qualifiers are the country code, country name and admin1 code/name of a
+place joined with QUALIFIER_SEP, used to resolve "Paris, FR" vs "Paris, TX".
+"""
+
+import bisect
+import logging
+import mmap
+import os
+import struct
+import threading
+import unicodedata
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"STGZ"
+VERSION = 1
+
+HEADER = struct.Struct("<4sIIIIII")
+PLACE = struct.Struct("<ddIII")
+KEY = struct.Struct("<II")
+STRLEN = struct.Struct("<H")
+
+QUALIFIER_SEP = "\x1f"
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "gazetteer.idx")
+
+# Common ways people write a country that don't match its ISO code or name
+COUNTRY_ALIASES = {
+    "uk": "gb",
+    "england": "gb",
+    "scotland": "gb",
+    "wales": "gb",
+    "great britain": "gb",
+    "britain": "gb",
+    "usa": "us",
+    "u s a": "us",
+    "u s": "us",
+    "america": "us",
+    "united states of america": "us",
+    "uae": "ae",
+    "holland": "nl",
+    "south korea": "kr",
+    "korea": "kr",
+    "russia": "ru",
+    "czech republic": "cz",
+}
+
+
+def normalize(text):
+    text = unicodedata.normalize("NFKD", str(text or ""))
+    text = "".join(c for c in text if not unicodedata.combining(c)).casefold()
+    text = "".join(c if c.isalnum() or c == "," else " " for c in text)
+    parts = [" ".join(part.split()) for part in text.split(",")]
+    return ",".join(part for part in parts if part)
+
+
+class _KeyView:
+    """Sequence over the sorted key table so bisect can search the mmap."""
+
+    def __init__(self, gazetteer):
+        self._gazetteer = gazetteer
+
+    def __len__(self):
+        return self._gazetteer.n_keys
+
+    def __getitem__(self, i):
+        return self._gazetteer._key_bytes(i)
+
+
+class Gazetteer:
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, n_places, n_keys, places_offset, keys_offset, strings_offset = (
+            HEADER.unpack_from(self._mm, 0)
+        )
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"Not a SoulTether gazetteer index: {path}")
+
+        self.n_places = n_places
+        self.n_keys = n_keys
+        self._places_offset = places_offset
+        self._keys_offset = keys_offset
+        self._strings_offset = strings_offset
+        self._keys = _KeyView(self)
+
+        self.hits = 0
+        self.misses = 0
+
+    def close(self):
+        self._mm.close()
+        self._file.close()
+
+    def lookup(self, location_str):
+        """Returns the most populous place matching the query as a dict, or
+        None. "City, Region, Country" style qualifiers must all match."""
+        parts = normalize(location_str).split(",")
+        name, qualifiers = parts[0], [COUNTRY_ALIASES.get(q, q) for q in parts[1:]]
+
+        best = None
+        if name:
+            for place_index in self._place_indexes(name):
+                place = self._place(place_index)
+                if qualifiers and not self._qualifiers_match(place, qualifiers):
+                    continue
+                if best is None or place["population"] > best["population"]:
+                    best = place
+
+        if best is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return best
+
+    def complete(self, prefix, limit=10):
+        """Returns up to `limit` distinct places whose name (or alternate
+        name) starts with prefix, most populous first."""
+        target = normalize(prefix).split(",")[0].encode()
+        if not target:
+            return []
+
+        places = {}
+        i = bisect.bisect_left(self._keys, target)
+        while i < self.n_keys:
+            key_ref, place_index = KEY.unpack_from(self._mm, self._keys_offset + i * KEY.size)
+            if not self._string_bytes(key_ref).startswith(target):
+                break
+            if place_index not in places:
+                places[place_index] = self._place(place_index)
+            i += 1
+
+        return sorted(places.values(), key=lambda p: -p["population"])[:limit]
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "places": self.n_places,
+            "keys": self.n_keys,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+    def _place_indexes(self, name):
+        target = name.encode()
+        lo = bisect.bisect_left(self._keys, target)
+        hi = bisect.bisect_right(self._keys, target, lo)
+        for i in range(lo, hi):
+            yield KEY.unpack_from(self._mm, self._keys_offset + i * KEY.size)[1]
+
+    def _place(self, place_index):
+        lat, lon, population, name_ref, qualifiers_ref = PLACE.unpack_from(
+            self._mm, self._places_offset + place_index * PLACE.size
+        )
+        return {
+            "name": self._string_bytes(name_ref).decode(),
+            "lat": lat,
+            "lon": lon,
+            "population": population,
+            "qualifiers": self._string_bytes(qualifiers_ref).decode().split(QUALIFIER_SEP),
+        }
+
+    def _qualifiers_match(self, place, qualifiers):
+        terms = {normalize(term) for term in place["qualifiers"] if term}
+        return all(q in terms for q in qualifiers)
+
+    def _key_bytes(self, i):
+        key_ref = KEY.unpack_from(self._mm, self._keys_offset + i * KEY.size)[0]
+        return self._string_bytes(key_ref)
+
+    def _string_bytes(self, ref):
+        offset = self._strings_offset + ref
+        length = STRLEN.unpack_from(self._mm, offset)[0]
+        start = offset + STRLEN.size
+        return self._mm[start:start + length]
+
+
+_gazetteer = None
+_gazetteer_loaded = False
+_gazetteer_lock = threading.Lock()
+
+
+def get_gazetteer():
+    """Returns the shared Gazetteer, or None if no index file is installed."""
+    global _gazetteer, _gazetteer_loaded
+
+    if _gazetteer_loaded:
+        return _gazetteer
+
+    with _gazetteer_lock:
+        if not _gazetteer_loaded:
+            path = os.environ.get("GAZETTEER_PATH", DEFAULT_PATH)
+            if path and os.path.exists(path):
+                try:
+                    _gazetteer = Gazetteer(path)
+                except (OSError, ValueError, struct.error) as e:
+                    logger.warning(f"Could not load gazetteer index {path}: {e}")
+            _gazetteer_loaded = True
+
+    return _gazetteer
+
+
+def lookup(location_str):
+    """Returns (lat, lon) from the offline gazetteer, or None on a miss."""
+    gazetteer = get_gazetteer()
+    if gazetteer is None:
+        return None
+
+    place = gazetteer.lookup(location_str)
+    if place is None:
+        return None
+
+    return place["lat"], place["lon"]
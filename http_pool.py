@@ -0,0 +1,156 @@
+"""
+Pooled HTTP sessions for outbound calls, one per upstream.
+
+Each upstream gets a requests.Session whose adapter keeps up to
+HTTP_POOL_SIZE keep-alive connections per host, so repeated calls to Ollama
+or a geocoder reuse TCP (and TLS) connections instead of opening a new one
+per request. Sessions are created per process, since pooled sockets must
+not be shared across a fork.
+
+Requests are retried on connection errors, and idempotent ones also on
+502/503/504, with jittered exponential backoff. A request that timed out
+waiting for the response is not retried, since the upstream already has it
+and retrying would only multiply the wait. Each upstream has a default
+(connect, read) timeout, which call sites may override, and may set its own
+number of retries.
+"""
+
+import os
+import random
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.retry import Retry
+
+import metrics
+
+POOL_SIZE = int(os.environ.get("HTTP_POOL_SIZE", 10))
+RETRIES = int(os.environ.get("HTTP_RETRIES", 2))
+
+# (connect, read) timeouts in seconds
+UPSTREAMS = {
+    "ollama": {"timeout": (5, 120), "retry_methods": ("GET",)},
+    # The circuit breaker's health check runs on a request thread, so it
+    # must fail fast rather than retry
+    "ollama_probe": {"timeout": (2, 2), "retry_methods": ("GET",), "retries": 0},
+    "geoapify": {"timeout": (5, 10), "retry_methods": ("GET",)},
+    "nominatim": {"timeout": (5, 10), "retry_methods": ("GET",)},
+}
+
+HTTP_REQUESTS = metrics.REGISTRY.counter(
+    "soultether_http_requests_total",
+    "Outbound HTTP requests (including retries) by upstream",
+    labels=("upstream",),
+)
+HTTP_CONNECTIONS = metrics.REGISTRY.counter(
+    "soultether_http_connections_total",
+    "New outbound connections opened by upstream; the rest were reused",
+    labels=("upstream",),
+)
+
+
+class JitteredRetry(Retry):
+    """Retry whose backoff is drawn uniformly from [0, exponential backoff]."""
+
+    def get_backoff_time(self):
+        return random.uniform(0, super().get_backoff_time())
+
+
+class _CountingPool:
+    """Counts requests sent and connections opened as they happen. The pools'
+    own counters are lost when the pool manager evicts a pool."""
+
+    upstream = None
+
+    def _new_conn(self):
+        HTTP_CONNECTIONS.inc(upstream=self.upstream)
+        return super()._new_conn()
+
+    def _make_request(self, *args, **kwargs):
+        HTTP_REQUESTS.inc(upstream=self.upstream)
+        return super()._make_request(*args, **kwargs)
+
+
+class CountingAdapter(HTTPAdapter):
+    """HTTPAdapter whose connection pools count into the upstream's metrics."""
+
+    def __init__(self, upstream, **kwargs):
+        self.upstream = upstream
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        attrs = {"upstream": self.upstream}
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": type("CountingHTTPConnectionPool", (_CountingPool, HTTPConnectionPool), attrs),
+            "https": type("CountingHTTPSConnectionPool", (_CountingPool, HTTPSConnectionPool), attrs),
+        }
+
+
+_lock = threading.Lock()
+_sessions = {}
+_sessions_pid = None
+
+
+def session(upstream):
+    """Returns this process's pooled session for upstream."""
+    global _sessions_pid
+    with _lock:
+        if _sessions_pid != os.getpid():
+            _sessions.clear()
+            _sessions_pid = os.getpid()
+        if upstream not in _sessions:
+            _sessions[upstream] = _make_session(upstream)
+        return _sessions[upstream]
+
+
+def request(upstream, method, url, **kwargs):
+    """requests.request through the upstream's pool, with its default timeout."""
+    kwargs.setdefault("timeout", UPSTREAMS[upstream]["timeout"])
+    return session(upstream).request(method, url, **kwargs)
+
+
+def get(upstream, url, **kwargs):
+    return request(upstream, "GET", url, **kwargs)
+
+
+def post(upstream, url, **kwargs):
+    return request(upstream, "POST", url, **kwargs)
+
+
+def _make_session(upstream):
+    retries = UPSTREAMS[upstream].get("retries", RETRIES)
+    retry = JitteredRetry(
+        total=retries,
+        connect=retries,
+        read=False,
+        status=retries,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=frozenset(UPSTREAMS[upstream]["retry_methods"]),
+        backoff_factor=0.5,
+        raise_on_status=False,
+    )
+    adapter = CountingAdapter(upstream, pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE, max_retries=retry)
+
+    http = requests.Session()
+    http.mount("http://", adapter)
+    http.mount("https://", adapter)
+    return http
+
+
+def stats():
+    """Requests sent and connections opened per upstream by this process."""
+    result = {}
+    for upstream in UPSTREAMS:
+        sent = HTTP_REQUESTS.value(upstream=upstream)
+        opened = HTTP_CONNECTIONS.value(upstream=upstream)
+        if not sent and not opened:
+            continue
+        result[upstream] = {
+            "requests": sent,
+            "connections": opened,
+            "reuse_rate": round(1 - opened / sent, 4) if sent else 0.0,
+        }
+    return result
@@ -0,0 +1,89 @@
+"""
+    This file is part of immanuel - (C) The Rift Lab
+    Author: Robert Davies (robert@theriftlab.com)
+
+
+    Times building the default settings.objects for a chart, comparing
+    the batched ephemeris.get_objects() with fetching each object through
+    ephemeris._get() one at a time as get_objects() used to.
+
+    "cold" uses a new Julian date for every chart so nothing is cached,
+    which is what a server sees for new birth data; "warm" repeats one
+    chart. Run from the repository root:
+
+        python benchmarks/ephemeris_objects.py --charts 2000
+
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from immanuel.classes.cache import FunctionCache
+from immanuel.const import calc, chart
+from immanuel.setup import settings
+from immanuel.tools import date, ephemeris
+
+
+LAT, LON = 32.7167, -117.15
+
+
+def per_object(jd: float) -> dict:
+    return {
+        index: ephemeris._get(
+            index=index,
+            jd=jd,
+            lat=LAT,
+            lon=LON,
+            house_system=chart.PLACIDUS,
+            part_formula=calc.DAY_NIGHT_FORMULA,
+            armc=None,
+            armc_obliquity=None,
+        )
+        for index in settings.objects
+    }
+
+
+def batched(jd: float) -> dict:
+    return ephemeris.get_objects(
+        settings.objects, jd, LAT, LON, chart.PLACIDUS, calc.DAY_NIGHT_FORMULA
+    )
+
+
+def run(func, charts: int, cold: bool, start: float) -> float:
+    """Returns the mean milliseconds per chart."""
+    FunctionCache.clear_all()
+    started = time.perf_counter()
+
+    for i in range(charts):
+        func(start + i * 0.731 if cold else start)
+
+    return (time.perf_counter() - started) / charts * 1000
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Times ephemeris.get_objects() batched against one object at a time."
+    )
+    parser.add_argument("--charts", type=int, default=1000)
+    args = parser.parse_args()
+
+    start = date.to_jd("1970-01-01 12:00")
+    print(f"{len(settings.objects)} objects per chart, {args.charts} charts\n")
+    print(f"{'':>12} {'cold ms':>10} {'warm ms':>10}")
+
+    for name, func in (("per object", per_object), ("batched", batched)):
+        # Separate date ranges so neither run warms the other's cache
+        offset = 0 if func is per_object else args.charts
+        cold = run(func, args.charts, True, start + offset)
+        warm = run(func, args.charts, False, start)
+        print(f"{name:>12} {cold:>10.3f} {warm:>10.3f}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
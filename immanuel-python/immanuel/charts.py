@@ -98,6 +98,7 @@ class Chart:
         }
         self._objects: dict
         self._houses: dict
+        self._house_index: position.HouseIndex
 
         self.generate()
         self.wrap()
@@ -106,7 +107,7 @@ class Chart:
         """Returns the index of the house where any passed arbitrary object
         would appear in the current chart. Useful for synastries and
         transit charts."""
-        return position.house(object.longitude.raw, self._houses)["index"]
+        return self._house_index.house(object.longitude.raw)["index"]
 
     def generate(self) -> None:
         """Generating the raw data is each descendant class's
@@ -116,6 +117,8 @@ class Chart:
     def wrap(self) -> None:
         """Loop through the required data and wrap each one with a custom
         function."""
+        self._house_index = position.HouseIndex(self._houses)
+
         for index in self._settings.chart_data[self._type]:
             method = f"set_wrapped_{index}"
             if hasattr(self, method):
@@ -143,12 +146,10 @@ class Chart:
 
     def set_wrapped_objects(self) -> None:
         self.objects = {}
+        object_houses = self._house_index.all(self._objects)
 
         for index, object in self._objects.items():
-            house = position.house(
-                object=object,
-                houses=self._houses,
-            )
+            house = object_houses[index]
             out_of_bounds = ephemeris.is_out_of_bounds(
                 object=object,
                 obliquity=self._obliquity,
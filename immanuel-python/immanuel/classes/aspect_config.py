@@ -0,0 +1,109 @@
+"""
+    This file is part of immanuel - (C) The Rift Lab
+    Author: Robert Davies (robert@theriftlab.com)
+
+
+    The aspect settings compiled into lookup tables. The cascading
+    aspect_rules and orbs settings rebuild their dicts on every access, which
+    is too slow to do for every pair of objects in a chart, so they are read
+    once here into per-object bitmasks and orb tuples ordered like the
+    aspects setting. Bit i of a mask is set when aspects[i] is allowed.
+
+    Settings hold one of these along with a frozen copy of the settings it
+    was built from, and rebuild it when those differ - including when a
+    setting's list or dict is changed in place. Reading the settings is
+    far cheaper than compiling them, but is still done once per chart
+    rather than once per pair of objects.
+
+"""
+
+from immanuel.const import calc
+
+
+class AspectConfig:
+    """ Stands in for an orb the settings don't define for an aspect. """
+    _MISSING = object()
+
+    def __init__(self, settings, inputs: tuple | None = None) -> None:
+        self.inputs = AspectConfig.inputs_of(settings) if inputs is None else inputs
+        self.aspects = tuple(settings.aspects)
+        self.exact_orb = settings.exact_orb
+        self.mean_orb = settings.orb_calculation == calc.MEAN
+
+        self._default_rule = self._masks(settings.default_aspect_rule)
+        self._rules = {
+            index: self._masks(rule) for index, rule in settings.aspect_rules.items()
+        }
+
+        self._default_orbs = (settings.default_orb,) * len(self.aspects)
+        self._orbs = {
+            index: tuple(object_orbs.get(aspect, AspectConfig._MISSING) for aspect in self.aspects)
+            for index, object_orbs in settings.orbs.items()
+        }
+
+        """ The widest orb any two objects could combine to, per aspect. """
+        defined = [self._default_orbs, *self._orbs.values()]
+        self.max_orbs = tuple(
+            max(
+                (orbs[i] for orbs in defined if orbs[i] is not AspectConfig._MISSING),
+                default=0.0,
+            )
+            for i in range(len(self.aspects))
+        )
+
+    def inputs_of(settings) -> tuple:
+        """Returns a frozen copy of every setting the config is built from."""
+        return _freeze((
+            settings.aspects,
+            settings.default_aspect_rule,
+            settings.aspect_rules,
+            settings.default_orb,
+            settings.orbs,
+            settings.exact_orb,
+            settings.orb_calculation,
+        ))
+
+    def allowed(self, active: int, passive: int) -> int:
+        """Returns how many aspects, in settings order, are checked between
+        the two objects: checking stops at the first aspect the active object
+        may not initiate or the passive object may not receive."""
+        initiate = self._rules.get(active, self._default_rule)[0]
+        receive = self._rules.get(passive, self._default_rule)[1]
+        mask = initiate & receive
+        return (~mask & (mask + 1)).bit_length() - 1
+
+    def orbs(self, index: int) -> tuple:
+        """Returns the object's orb for each aspect in settings order."""
+        return self._orbs.get(index, self._default_orbs)
+
+    def incomplete(self, index: int) -> bool:
+        """Whether the object is missing an orb for any aspect."""
+        return AspectConfig._MISSING in self.orbs(index)
+
+    def orb(self, active_orbs: tuple, passive_orbs: tuple, i: int) -> float:
+        """Combines two objects' orbs for aspects[i]."""
+        active_orb = active_orbs[i]
+        passive_orb = passive_orbs[i]
+
+        if active_orb is AspectConfig._MISSING or passive_orb is AspectConfig._MISSING:
+            raise KeyError(self.aspects[i])
+
+        return (
+            ((active_orb + passive_orb) / 2)
+            if self.mean_orb
+            else max(active_orb, passive_orb)
+        )
+
+    def _masks(self, rule: dict) -> tuple:
+        return tuple(
+            sum(1 << i for i, aspect in enumerate(self.aspects) if aspect in rule[key])
+            for key in ("initiate", "receive")
+        )
+
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return tuple((key, _freeze(item)) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
@@ -3,24 +3,230 @@
     Author: Robert Davies (robert@theriftlab.com)
 
 
-    Basic wrapper for the functools @cache decorator. This way we can keep
-    track of which functions are being cached and can easily clear them.
+    Memoization for the ephemeris functions. Each decorated function gets
+    its own least-recently-used cache with an entry limit and optional
+    time-to-live, and all of them share one approximate memory budget: when
+    the total goes over it, the cache using the most memory gives up its
+    oldest entries first. This keeps a long-running process from growing
+    without limit as it sees new Julian dates.
+
+    FunctionCache keeps track of every cached function so they can all be
+    cleared at once (eg. when the locale changes) and their statistics read.
 
 """
 
 import functools
-from typing import Callable
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable
+
+
+""" Returned by cache_get() when nothing is cached for the arguments. """
+MISSING = object()
 
 
 class FunctionCache:
     registry = []
 
+    """ Defaults for functions decorated without their own limits. """
+    maxsize = 4096
+    ttl = None
+
+    """ Approximate total bytes across all cached functions, or None. """
+    max_bytes = 64 * 1024 * 1024
+
+    _lock = threading.RLock()
+
     def clear_all() -> None:
         for cached_func in FunctionCache.registry:
             cached_func.cache_clear()
 
+    def stats() -> dict:
+        """Returns each cached function's statistics by qualified name."""
+        return {
+            f"{cached_func.__module__}.{cached_func.__qualname__}": cached_func.cache_info()
+            for cached_func in FunctionCache.registry
+        }
+
+    def total_bytes() -> int:
+        return sum(cached_func.cache.bytes for cached_func in FunctionCache.registry)
+
+    def enforce_budget() -> None:
+        """Evicts from the largest caches until the total fits max_bytes."""
+        if FunctionCache.max_bytes is None:
+            return
+
+        with FunctionCache._lock:
+            caches = [cached_func.cache for cached_func in FunctionCache.registry]
+            total = sum(lru.bytes for lru in caches)
+            while total > FunctionCache.max_bytes:
+                largest = max(caches, key=lambda lru: lru.bytes)
+                freed = largest.evict_oldest()
+                if freed is None:
+                    break
+                total -= freed
+
+
+class LRUCache:
+    _MISSING = MISSING
+
+    def __init__(self, maxsize: int | None = None, ttl: float | None = None) -> None:
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @property
+    def maxsize(self) -> int | None:
+        return self._maxsize if self._maxsize is not None else FunctionCache.maxsize
+
+    @property
+    def ttl(self) -> float | None:
+        return self._ttl if self._ttl is not None else FunctionCache.ttl
+
+    def get(self, key: Any) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return LRUCache._MISSING
+
+            value, size, expires = entry
+            if expires is not None and expires <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return LRUCache._MISSING
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Any, value: Any) -> None:
+        ttl = self.ttl
+        expires = time.monotonic() + ttl if ttl is not None else None
+        size = _sizeof(key) + _sizeof(value)
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, size, expires)
+            self.bytes += size
+
+            maxsize = self.maxsize
+            while maxsize is not None and len(self._entries) > maxsize:
+                self.evict_oldest()
+
+    def evict_oldest(self) -> int | None:
+        """Drops the least recently used entry and returns its size."""
+        with self._lock:
+            if not self._entries:
+                return None
+            key = next(iter(self._entries))
+            self.evictions += 1
+            return self._remove(key)
 
-def cache(func: Callable) -> Callable:
-    cached_func = functools.cache(func)
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def info(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "currsize": len(self._entries),
+                "maxsize": self.maxsize,
+                "bytes": self.bytes,
+                "ttl": self.ttl,
+            }
+
+    def _remove(self, key: Any) -> int:
+        size = self._entries.pop(key)[1]
+        self.bytes -= size
+        return size
+
+
+def cache(
+    func: Callable | None = None, *, maxsize: int | None = None, ttl: float | None = None
+) -> Callable:
+    """Use as @cache, or @cache(maxsize=..., ttl=...) to override the
+    FunctionCache defaults for one function. Like functools.cache, the
+    wrapped function gains cache_clear() and cache_info(). cache_get() and
+    cache_set() read and store entries directly by positional arguments,
+    for callers that compute several results in one batch."""
+    if func is None:
+        return functools.partial(cache, maxsize=maxsize, ttl=ttl)
+
+    lru = LRUCache(maxsize, ttl)
+
+    @functools.wraps(func)
+    def cached_func(*args, **kwargs):
+        key = _make_key(args, kwargs)
+        value = lru.get(key)
+
+        if value is LRUCache._MISSING:
+            value = func(*args, **kwargs)
+            lru.set(key, value)
+            FunctionCache.enforce_budget()
+
+        return value
+
+    def cache_get(*args) -> Any:
+        return lru.get(_make_key(args, {}))
+
+    def cache_set(args: tuple, value: Any) -> None:
+        """Stores value as the result for args. The caller is expected to
+        call FunctionCache.enforce_budget() when done storing."""
+        lru.set(_make_key(args, {}), value)
+
+    cached_func.cache = lru
+    cached_func.cache_clear = lru.clear
+    cached_func.cache_info = lru.info
+    cached_func.cache_get = cache_get
+    cached_func.cache_set = cache_set
     FunctionCache.registry.append(cached_func)
     return cached_func
+
+
+_KWARGS_MARK = object()
+
+
+def _make_key(args: tuple, kwargs: dict) -> tuple:
+    if not kwargs:
+        return args
+    return args + (_KWARGS_MARK,) + tuple(sorted(kwargs.items()))
+
+
+_SCALARS = (str, int, float, bool, type(None))
+
+
+def _sizeof(obj: Any, depth: int = 0) -> int:
+    """Approximate deep size of the plain data the ephemeris returns.
+    Every child's own size is summed in one pass, then only containers are
+    recursed into, since scalars make up most of the data."""
+    size = sys.getsizeof(obj)
+    if depth > 4:
+        return size
+    if isinstance(obj, dict):
+        children = [*obj.keys(), *obj.values()]
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        children = obj
+    else:
+        return size
+
+    size += sum(map(sys.getsizeof, children))
+    for child in children:
+        if type(child) not in _SCALARS:
+            size += _sizeof(child, depth + 1) - sys.getsizeof(child)
+    return size
@@ -9,10 +9,20 @@
     The functions also rely on the object data returned by the
     ephemeris module.
 
+    Whole charts and synastries are compared pair by pair: each unordered
+    pair of a chart's objects is only evaluated once. If NumPy is
+    available, the distances between every pair are worked out at once and
+    only pairs within reach of an aspect are passed on to between().
+
 """
 
 import swisseph as swe
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 from immanuel.const import calc
 from immanuel.setup import ImmanuelSettings, settings as default_settings
 from immanuel.tools import position
@@ -22,51 +32,26 @@ def between(
     object1: dict, object2: dict, settings: ImmanuelSettings = default_settings
 ) -> dict:
     """Returns any aspect between the two passed objects."""
+    return _between(object1, object2, settings.aspect_config)
+
+
+def _between(object1: dict, object2: dict, config) -> dict:
     active, passive = (
         (object1, object2)
         if abs(object1["speed"]) > abs(object2["speed"])
         else (object2, object1)
     )
 
-    for aspect in settings.aspects:
-        # Check aspect rules
-        active_aspect_rule = (
-            settings.aspect_rules[active["index"]]
-            if active["index"] in settings.aspect_rules
-            else settings.default_aspect_rule
-        )
-        passive_aspect_rule = (
-            settings.aspect_rules[passive["index"]]
-            if passive["index"] in settings.aspect_rules
-            else settings.default_aspect_rule
-        )
-
-        if (
-            aspect not in active_aspect_rule["initiate"]
-            or aspect not in passive_aspect_rule["receive"]
-        ):
-            return None
-
-        # Get orbs
-        active_orb = (
-            settings.orbs[active["index"]][aspect]
-            if active["index"] in settings.orbs
-            else settings.default_orb
-        )
-        passive_orb = (
-            settings.orbs[passive["index"]][aspect]
-            if passive["index"] in settings.orbs
-            else settings.default_orb
-        )
-        orb = (
-            ((active_orb + passive_orb) / 2)
-            if settings.orb_calculation == calc.MEAN
-            else max(active_orb, passive_orb)
-        )
+    active_orbs = config.orbs(active["index"])
+    passive_orbs = config.orbs(passive["index"])
+    distance = swe.difdeg2n(passive["lon"], active["lon"])
 
-        # Look for an aspect
-        distance = swe.difdeg2n(passive["lon"], active["lon"])
+    # Only aspects both objects' rules allow are checked
+    for i in range(config.allowed(active["index"], passive["index"])):
+        aspect = config.aspects[i]
+        orb = config.orb(active_orbs, passive_orbs, i)
 
+        # Look for an aspect
         if aspect - orb <= abs(distance) <= aspect + orb:
             # Work out aspect information
             aspect_orb = abs(distance) - aspect
@@ -75,9 +60,9 @@ def between(
             )
             associate = position.sign(exact_lon) == position.sign(active)
             exact = (
-                exact_lon - settings.exact_orb
+                exact_lon - config.exact_orb
                 <= active["lon"]
-                <= exact_lon + settings.exact_orb
+                <= exact_lon + config.exact_orb
             )
             applicative = not exact and (
                 (aspect_orb < 0 if distance < 0 else aspect_orb > 0)
@@ -113,12 +98,13 @@ def for_object(
     exclude_self can be set to False to find aspects between the same
     object in both charts."""
     aspects = {}
+    config = settings.aspect_config
 
     for index, check_object in objects.items():
         if exclude_same and index == object["index"]:
             continue
 
-        aspect = between(object, check_object, settings)
+        aspect = _between(object, check_object, config)
 
         if aspect is not None:
             aspects[check_object["index"]] = aspect
@@ -132,15 +118,7 @@ def all(
     settings: ImmanuelSettings = default_settings,
 ) -> dict:
     """Returns all aspects between the passed chart objects."""
-    aspects = {}
-
-    for index, object in objects.items():
-        object_aspects = for_object(object, objects, exclude_same, settings)
-
-        if object_aspects:
-            aspects[index] = object_aspects
-
-    return aspects
+    return _collect(objects, objects, _find(list(objects.values()), None, exclude_same, settings))
 
 
 def by_type(
@@ -152,16 +130,13 @@ def by_type(
     aspect type."""
     aspects = {}
 
-    for object in objects.values():
-        object_aspects = for_object(object, objects, exclude_same, settings)
-
-        if object_aspects:
-            for object_aspect in object_aspects.values():
-                if object_aspect["aspect"] not in aspects:
-                    aspects[object_aspect["aspect"]] = []
+    for object_aspects in all(objects, exclude_same, settings).values():
+        for object_aspect in object_aspects.values():
+            if object_aspect["aspect"] not in aspects:
+                aspects[object_aspect["aspect"]] = []
 
-                if object_aspect not in aspects[object_aspect["aspect"]]:
-                    aspects[object_aspect["aspect"]].append(object_aspect)
+            if object_aspect not in aspects[object_aspect["aspect"]]:
+                aspects[object_aspect["aspect"]].append(object_aspect)
 
     return aspects
 
@@ -173,12 +148,90 @@ def synastry(
     settings: ImmanuelSettings = default_settings,
 ) -> dict:
     """Returns all aspects between the two sets of passed chart objects."""
-    aspects = {}
+    found = _find(list(objects1.values()), list(objects2.values()), exclude_same, settings)
+    return _collect(objects1, objects2, found)
+
 
-    for index, object in objects1.items():
-        object_aspects = for_object(object, objects2, exclude_same, settings)
+""" Allowance for NumPy and pyswisseph rounding distances differently. """
+_SCREEN_TOLERANCE = 1e-6
 
-        if object_aspects:
-            aspects[index] = object_aspects
+
+def _find(
+    rows: list, columns: list | None, exclude_same: bool, settings: ImmanuelSettings
+) -> list:
+    """Returns a dict of aspects for each row object keyed by the position
+    of the column object. With no columns the rows are compared with each
+    other and each pair is evaluated once for both directions. The
+    settings are compiled once here for every pair."""
+    config = settings.aspect_config
+    symmetric = columns is None
+    columns = rows if symmetric else columns
+    found = [{} for _ in rows]
+
+    for i, j in _candidates(rows, columns, symmetric, config):
+        row, column = rows[i], columns[j]
+
+        if exclude_same and row["index"] == column["index"]:
+            continue
+
+        object_aspect = _between(row, column, config)
+
+        if object_aspect is not None:
+            found[i][j] = object_aspect
+
+        if symmetric and i != j:
+            # between() picks the active object by speed, so only a tie
+            # makes the other direction any different
+            if abs(row["speed"]) == abs(column["speed"]):
+                object_aspect = _between(column, row, config)
+            elif object_aspect is not None:
+                object_aspect = dict(object_aspect)
+
+            if object_aspect is not None:
+                found[j][i] = object_aspect
+
+    return found
+
+
+def _candidates(rows: list, columns: list, symmetric: bool, config) -> list:
+    """Returns the (row, column) positions worth passing to between(),
+    only the upper triangle if symmetric."""
+    if np is None:
+        return [
+            (i, j)
+            for i in range(len(rows))
+            for j in range(i if symmetric else 0, len(columns))
+        ]
+
+    row_lons = np.array([object["lon"] for object in rows], dtype=float)
+    column_lons = np.array([object["lon"] for object in columns], dtype=float)
+    distances = np.abs((column_lons[np.newaxis, :] - row_lons[:, np.newaxis] + 180) % 360 - 180)
+
+    near = np.zeros(distances.shape, dtype=bool)
+    for aspect, max_orb in zip(config.aspects, config.max_orbs):
+        near |= np.abs(distances - aspect) <= max_orb + _SCREEN_TOLERANCE
+
+    # between() raises on a missing orb, so don't screen those objects out
+    near[np.array([config.incomplete(object["index"]) for object in rows], dtype=bool), :] = True
+    near[:, np.array([config.incomplete(object["index"]) for object in columns], dtype=bool)] = True
+
+    if symmetric:
+        near = np.triu(near)
+
+    return list(zip(*(positions.tolist() for positions in np.nonzero(near))))
+
+
+def _collect(objects1: dict, objects2: dict, found: list) -> dict:
+    """Expands _find() results into the usual dict of dicts, keyed by
+    object index and ordered as the passed objects."""
+    aspects = {}
+    columns = list(objects2.values())
+
+    for (index, object), object_found in zip(objects1.items(), found):
+        if object_found:
+            aspects[index] = {
+                columns[j]["index"]: object_aspect
+                for j, object_aspect in sorted(object_found.items())
+            }
 
     return aspects
@@ -53,8 +53,10 @@ def quadrants(objects: dict, houses: dict) -> dict:
         4: [],
     }
 
-    for object in objects.values():
-        house = position.house(object, houses)
+    object_houses = position.HouseIndex(houses).all(objects)
+
+    for index, object in objects.items():
+        house = object_houses[index]
         quadrant = int((house["number"] - 1) / 3) + 1
         weightings[quadrant].append(object["index"])
 
@@ -13,6 +13,7 @@ from typing import Any
 
 import swisseph as swe
 
+from immanuel.classes.aspect_config import AspectConfig
 from immanuel.classes.localize import Localize
 from immanuel.const import calc, chart, data, dignities
 
@@ -243,6 +244,21 @@ class BaseSettings(ImmanuelSettings):
         self._aspect_rules = {}
         self._orbs = {}
 
+        """ Compiled on first use by aspect_config. """
+        self._aspect_config = None
+
+    @property
+    def aspect_config(self) -> AspectConfig:
+        """Aspect rules and orbs compiled for the aspect calculations,
+        rebuilt whenever the settings they come from have changed."""
+        inputs = AspectConfig.inputs_of(self)
+        config = self._aspect_config
+
+        if config is None or config.inputs != inputs:
+            config = self._aspect_config = AspectConfig(self, inputs)
+
+        return config
+
     @property
     def locale(self) -> str:
         return self._locale
@@ -18,7 +18,7 @@ import math
 
 import swisseph as swe
 
-from immanuel.classes.cache import cache
+from immanuel.classes.cache import MISSING, FunctionCache, cache
 from immanuel.classes.localize import localize as _
 from immanuel.const import calc, chart, names
 
@@ -360,20 +360,7 @@ def get_planet(index: int, jd: float) -> dict:
     """Returns a pyswisseph object by Julian date. Can be used to
     return the six major asteroids supported by pyswisseph without using
     a separate file."""
-    ec_res = swe.calc_ut(jd, _SWE[index])[0]
-    eq_res = swe.cotrans((ec_res[0], ec_res[1], ec_res[2]), -earth_obliquity(jd))
-    asteroid = _type(index) == chart.ASTEROID
-
-    return {
-        "index": index,
-        "type": chart.ASTEROID if asteroid else chart.PLANET,
-        "name": _(names.ASTEROIDS[index] if asteroid else names.PLANETS[index]),
-        "lon": ec_res[0],
-        "lat": ec_res[1],
-        "dist": ec_res[2],
-        "speed": ec_res[3],
-        "dec": eq_res[1],
-    }
+    return _get_planet(index, jd, earth_obliquity(jd))
 
 
 @cache
@@ -464,24 +451,79 @@ def _get_objects(
     armc: float | None,
     armc_obliquity: float | None,
 ) -> dict:
-    """Function for items() and armc_items()."""
+    """Function for items() and armc_items(). Planets are calculated
+    together first, everything else is passed on to _get()."""
+    if armc is not None and armc_obliquity is None:
+        armc_obliquity = earth_obliquity(jd)
+
+    planets = _get_planets(
+        [index for index in object_list if _is_planet(index)],
+        jd,
+    )
     objects = {}
 
     for index in object_list:
-        objects[index] = _get(
-            index=index,
-            jd=jd,
-            lat=lat,
-            lon=lon,
-            house_system=house_system,
-            part_formula=part_formula,
-            armc=armc,
-            armc_obliquity=armc_obliquity,
+        objects[index] = (
+            planets[index]
+            if index in planets
+            else _get(
+                index=index,
+                jd=jd,
+                lat=lat,
+                lon=lon,
+                house_system=house_system,
+                part_formula=part_formula,
+                armc=armc,
+                armc_obliquity=armc_obliquity,
+            )
         )
 
     return objects
 
 
+def _get_planets(indices: list, jd: float) -> dict:
+    """Batch version of get_planet() for one Julian date. Cached planets are
+    reused; the rest share one obliquity lookup and are stored in
+    get_planet()'s cache for later calls (parts, moon phase, dignities)."""
+    planets = {}
+    obliquity = None
+
+    for index in indices:
+        planet = get_planet.cache_get(index, jd)
+
+        if planet is MISSING:
+            if obliquity is None:
+                obliquity = earth_obliquity(jd)
+
+            planet = _get_planet(index, jd, obliquity)
+            get_planet.cache_set((index, jd), planet)
+
+        planets[index] = planet
+
+    if obliquity is not None:
+        FunctionCache.enforce_budget()
+
+    return planets
+
+
+def _get_planet(index: int, jd: float, obliquity: float) -> dict:
+    """Function for get_planet() and _get_planets()."""
+    ec_res = swe.calc_ut(jd, _SWE[index])[0]
+    eq_res = swe.cotrans((ec_res[0], ec_res[1], ec_res[2]), -obliquity)
+    asteroid = _type(index) == chart.ASTEROID
+
+    return {
+        "index": index,
+        "type": chart.ASTEROID if asteroid else chart.PLANET,
+        "name": _(names.ASTEROIDS[index] if asteroid else names.PLANETS[index]),
+        "lon": ec_res[0],
+        "lat": ec_res[1],
+        "dist": ec_res[2],
+        "speed": ec_res[3],
+        "dec": eq_res[1],
+    }
+
+
 def _get(
     index: int | str,
     jd: float,
@@ -851,6 +893,15 @@ def _first_house_planet_index(house_system: int) -> int:
     return (house_system - chart.PLANET_ON_FIRST) + chart.PLANET
 
 
+def _is_planet(index: int | str) -> bool:
+    """Whether get_planet() handles this object index."""
+    return (
+        isinstance(index, int)
+        and index > chart.TYPE_MULTIPLIER
+        and _type(index) in (chart.PLANET, chart.ASTEROID)
+    )
+
+
 def _type(index: int) -> int:
     """Return the type index of a given object's index."""
     return round(index, -2)
@@ -7,18 +7,18 @@
     Since longitudes can either be extracted from objects or calculated
     directly, these functions will accept both an object and a float.
 
+    House lookups go through HouseIndex, which sorts a chart's cusps once
+    and then finds the house for any longitude by binary search.
+
 """
 
-import json
+from bisect import bisect_right
 
 import swisseph as swe
 
 from immanuel.const import chart
 
 
-_house = {}
-
-
 def sign(object: dict | float) -> int:
     """Returns the index of the zodiac sign the
     passed object belongs to."""
@@ -42,22 +42,47 @@ def decan(object: dict | float) -> int:
     return int((object["lon"] if isinstance(object, dict) else object) % 30) // 10 + 1
 
 
-def house(object: dict | float, houses: dict) -> int:
-    """Given a object and a dict of houses from the ephemeris module, this
-    returns which house the object is in. Basic dict caching is used."""
-    lon = object["lon"] if isinstance(object, dict) else object
-    key = json.dumps([lon, houses])
+class HouseIndex:
+    """Built once from a dict of houses from the ephemeris module, this
+    answers which house any longitude falls in."""
+
+    def __init__(self, houses: dict) -> None:
+        self._houses = list(houses.values())
+        self._sorted = sorted(self._houses, key=lambda house: house["lon"])
+        self._cusps = [house["lon"] for house in self._sorted]
+
+    def house(self, object: dict | float) -> dict | None:
+        """Returns the house the passed object or longitude is in."""
+        if not self._sorted:
+            return None
+
+        lon = object["lon"] if isinstance(object, dict) else object
+        # The last cusp at or before lon, wrapping to the highest cusp
+        i = bisect_right(self._cusps, lon) - 1
+        candidate = self._sorted[i]
 
-    if key in _house:
-        return _house[key]
+        if _in_house(lon, candidate) and not _in_house(lon, self._sorted[i - 1]):
+            return candidate
 
-    for house in houses.values():
-        lon_diff = swe.difdeg2n(lon, house["lon"])
-        next_cusp_diff = swe.difdeg2n(house["lon"] + house["size"], house["lon"])
+        # Houses that don't tile the circle exactly (eg. midpoint composites
+        # with averaged sizes) fall back to the first matching house.
+        for house in self._houses:
+            if _in_house(lon, house):
+                return house
 
-        if 0 <= lon_diff < next_cusp_diff:
-            _house[key] = house
-            return house
+        return None
+
+    def all(self, objects: dict) -> dict:
+        """Returns the house of every object in a dict of objects,
+        keyed by the same index."""
+        return {index: self.house(object) for index, object in objects.items()}
+
+
+def house(object: dict | float, houses: dict) -> dict | None:
+    """Given a object and a dict of houses from the ephemeris module, this
+    returns which house the object is in. To place several objects in the
+    same houses, build a HouseIndex once instead."""
+    return HouseIndex(houses).house(object)
 
 
 def opposite_house(object: dict | float, houses: dict) -> int:
@@ -80,3 +105,9 @@ def modality(object: dict | float) -> int:
     """Returns the modality associated with the sign
     which the passed object belongs to."""
     return int((object["lon"] if isinstance(object, dict) else object) / 30) % 3 + 1
+
+
+def _in_house(lon: float, house: dict) -> bool:
+    lon_diff = swe.difdeg2n(lon, house["lon"])
+    next_cusp_diff = swe.difdeg2n(house["lon"] + house["size"], house["lon"])
+    return 0 <= lon_diff < next_cusp_diff
@@ -110,3 +110,27 @@ def test_synastry(objects, partner_objects):
     assert sun[chart.TRUE_SOUTH_NODE]["aspect"] == calc.CONJUNCTION
     assert chart.VENUS in sun
     assert sun[chart.VENUS]["aspect"] == calc.SQUARE
+
+
+def test_all_matches_for_object(objects, partner_objects, monkeypatch):
+    # Each pair is evaluated once, with or without NumPy screening, but the
+    # result must be the same as checking every object against the others
+    expected = {}
+    for index, object in objects.items():
+        object_aspects = aspect.for_object(object, objects)
+        if object_aspects:
+            expected[index] = object_aspects
+
+    expected_synastry = {
+        index: aspect.for_object(object, partner_objects, exclude_same=False)
+        for index, object in objects.items()
+    }
+    expected_synastry = {k: v for k, v in expected_synastry.items() if v}
+
+    assert aspect.all(objects) == expected
+    assert aspect.synastry(objects, partner_objects) == expected_synastry
+
+    monkeypatch.setattr(aspect, "np", None)
+
+    assert aspect.all(objects) == expected
+    assert aspect.synastry(objects, partner_objects) == expected_synastry
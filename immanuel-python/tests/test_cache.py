@@ -0,0 +1,150 @@
+"""
+    This file is part of immanuel - (C) The Rift Lab
+    Author: Robert Davies (robert@theriftlab.com)
+
+
+    Test the bounded function cache: LRU limits, expiry, the shared memory
+    budget, statistics, and that the ephemeris functions still cache.
+
+"""
+
+from pytest import fixture
+
+from immanuel.classes import cache as cache_module
+from immanuel.classes.cache import FunctionCache, cache
+from immanuel.const import chart
+from immanuel.tools import date, ephemeris
+
+
+@fixture
+def jd():
+    return date.to_jd("2000-01-01 10:00")
+
+
+@fixture
+def calls():
+    return []
+
+
+@fixture
+def square(calls):
+    @cache(maxsize=3)
+    def square(x, offset=0):
+        calls.append(x)
+        return {"value": x * x + offset}
+
+    yield square
+    FunctionCache.registry.remove(square)
+
+
+def teardown_function():
+    FunctionCache.maxsize = 4096
+    FunctionCache.ttl = None
+    FunctionCache.max_bytes = 64 * 1024 * 1024
+
+
+def test_returns_cached_object(square, calls):
+    first = square(4)
+    assert square(4) is first
+    assert calls == [4]
+
+
+def test_keyword_arguments(square, calls):
+    assert square(2, offset=1)["value"] == 5
+    assert square(2, offset=1)["value"] == 5
+    assert square(2)["value"] == 4
+    assert calls == [2, 2]
+
+
+def test_lru_eviction(square, calls):
+    for x in (1, 2, 3):
+        square(x)
+    square(1)
+    square(4)
+    square(1)
+    square(2)
+
+    assert calls == [1, 2, 3, 4, 2]
+    info = square.cache_info()
+    assert info["currsize"] == 3
+    assert info["evictions"] == 2
+
+
+def test_ttl(square, calls, monkeypatch):
+    FunctionCache.ttl = 10
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now[0])
+
+    square(5)
+    now[0] += 5
+    square(5)
+    now[0] += 6
+    square(5)
+
+    assert calls == [5, 5]
+    assert square.cache_info()["expirations"] == 1
+
+
+def test_memory_budget(square, calls):
+    @cache(maxsize=100)
+    def big(x):
+        return list(range(1000))
+
+    try:
+        big(1)
+        square(1)
+        FunctionCache.max_bytes = FunctionCache.total_bytes() - 1
+        square(2)
+
+        assert big.cache_info()["currsize"] == 0
+        assert square.cache_info()["currsize"] == 2
+        assert FunctionCache.total_bytes() <= FunctionCache.max_bytes
+    finally:
+        FunctionCache.registry.remove(big)
+
+
+def test_stats(square):
+    square(1)
+    square(1)
+    stats = FunctionCache.stats()
+
+    assert stats[f"{square.__module__}.{square.__qualname__}"] == square.cache_info()
+    info = square.cache_info()
+    assert (info["hits"], info["misses"], info["maxsize"]) == (1, 1, 3)
+    assert info["bytes"] > 0
+
+
+def test_clear_all(square, calls):
+    square(1)
+    FunctionCache.clear_all()
+    square(1)
+
+    assert calls == [1, 1]
+    assert square.cache_info()["bytes"] > 0
+
+
+def test_cache_get_set(square, calls):
+    assert square.cache_get(3) is cache_module.MISSING
+
+    square.cache_set((3,), {"value": 0})
+    assert square(3)["value"] == 0
+    assert square.cache_get(3) == {"value": 0}
+    assert calls == []
+
+
+def test_entries_sized_exactly():
+    lru = cache_module.LRUCache(maxsize=100)
+    lru.set("small", {"value": "a" * 100})
+    small = lru.bytes
+
+    lru.set("large", {"value": "a" * 10000})
+    assert lru.bytes - small >= 10000
+
+
+def test_ephemeris_cached(jd):
+    ephemeris.get_planet.cache_clear()
+    sun = ephemeris.get_planet(chart.SUN, jd)
+
+    assert ephemeris.get_planet(chart.SUN, jd) is sun
+    assert ephemeris.get_planet.cache_info()["hits"] >= 1
+    assert ephemeris.get_planet in FunctionCache.registry
@@ -231,6 +231,20 @@ def test_get_objects(jd, coords):
     assert tuple(objects.keys()) == chart_objects
 
 
+def test_get_objects_batched(jd, coords):
+    ephemeris.get_planet.cache_clear()
+    objects = ephemeris.get_objects(
+        settings.objects, jd, *coords, chart.PLACIDUS, calc.DAY_NIGHT_FORMULA
+    )
+
+    # Planets calculated together are cached for later single lookups
+    assert ephemeris.get_planet(chart.SUN, jd) is objects[chart.SUN]
+
+    ephemeris.get_planet.cache_clear()
+    for index, object in objects.items():
+        assert ephemeris.get(index, jd, *coords, chart.PLACIDUS) == object
+
+
 def test_get_armc_objects(jd, coords, armc):
     chart_objects = (
         chart.SUN,
@@ -167,6 +167,21 @@ def test_opposite_house(jd, coords, data, astro):
         assert position.opposite_house(object, houses) == astro[key]["opposite_house"]
 
 
+def test_house_index(jd, coords, data, astro):
+    houses = ephemeris.get_houses(jd, *coords, chart.PLACIDUS)
+    index = position.HouseIndex(houses)
+    objects = {k: v for k, v in data.items() if "house" in astro[k]}
+
+    for key, house in index.all(objects).items():
+        assert house["number"] == astro[key]["house"]
+        assert index.house(objects[key]["lon"]) is house
+
+    # Cusps belong to the house they open, including the one spanning 0°
+    for house in houses.values():
+        assert index.house(house["lon"]) is house
+        assert index.house((house["lon"] + house["size"] / 2) % 360) is house
+
+
 def test_element(data, astro):
     for key, object in data.items():
         assert position.element(object) == astro[key]["element"]
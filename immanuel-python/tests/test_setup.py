@@ -101,6 +101,50 @@ def test_settings_are_respected(native):
     assert chart.SUN not in natal.aspects
 
 
+def test_settings_changed_in_place(native):
+    natal = charts.Natal(native)
+    assert any(
+        object_aspect.aspect == calc.CONJUNCTION
+        for object_aspects in natal.aspects.values()
+        for object_aspect in object_aspects.values()
+    )
+
+    settings.aspects.remove(calc.CONJUNCTION)
+    settings.planet_orbs[calc.OPPOSITION] = 4.0
+
+    natal = charts.Natal(native)
+    assert not any(
+        object_aspect.aspect == calc.CONJUNCTION
+        for object_aspects in natal.aspects.values()
+        for object_aspect in object_aspects.values()
+    )
+    assert settings.aspect_config.orbs(chart.SUN)[0] == 4.0
+
+
+def test_aspect_config():
+    config = settings.aspect_config
+    assert settings.aspect_config is config
+    assert config.aspects == tuple(settings.aspects)
+
+    settings.aspects = [calc.CONJUNCTION, calc.OPPOSITION]
+    config = settings.aspect_config
+    assert config.aspects == (calc.CONJUNCTION, calc.OPPOSITION)
+
+    # Points only initiate conjunctions, so only the first aspect is checked
+    assert config.allowed(chart.SUN, chart.MOON) == 2
+    assert config.allowed(chart.ASC, chart.SUN) == 1
+    assert config.orbs(chart.SUN) == (10.0, 10.0)
+    assert config.orbs(chart.CERES) == (1.0, 1.0)
+
+    settings.orbs = {chart.SUN: {calc.CONJUNCTION: 4.0}}
+    config = settings.aspect_config
+    assert config.orb(config.orbs(chart.SUN), config.orbs(chart.MOON), 0) == 7.0
+
+    # A missing orb only matters once that aspect is checked
+    with pytest.raises(KeyError):
+        config.orb(config.orbs(chart.SUN), config.orbs(chart.MOON), 1)
+
+
 def test_custom_settings(native):
     custom_settings = BaseSettings()
     custom_settings.objects = [
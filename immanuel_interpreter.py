@@ -1,4 +1,3 @@
-import json
 import os
 import random
 from datetime import datetime
@@ -7,6 +6,9 @@ from immanuel.classes.serialize import ToJSON
 from immanuel.setup import settings
 import swisseph as swe
 
+import metrics
+from training_data import get_training_data
+
 IMMANUEL_EPHE = os.path.join(os.path.dirname(__file__), "immanuel-python/immanuel/resources/ephemeris")
 EPHE_PATH = IMMANUEL_EPHE if os.path.exists(IMMANUEL_EPHE) else "/swisseph-master/ephe"
 
@@ -19,7 +21,6 @@ except:
 
 class TrainingDataLoader:
     _instance = None
-    _data = None
     
     @classmethod
     def get_instance(cls):
@@ -28,50 +29,13 @@ class TrainingDataLoader:
         return cls._instance
     
     def __init__(self):
-        if TrainingDataLoader._data is None:
-            try:
-                data_path = os.path.join(os.path.dirname(__file__), "astrology_training_data.json")
-                if os.path.exists(data_path):
-                    with open(data_path, 'r') as f:
-                        TrainingDataLoader._data = json.load(f)
-                        print(f"✓ Loaded {len(TrainingDataLoader._data)} training interpretations")
-                else:
-                    TrainingDataLoader._data = []
-                    print("⚠ Training data file not found")
-            except Exception as e:
-                TrainingDataLoader._data = []
-                print(f"⚠ Error loading training data: {e}")
+        self.data = get_training_data()
     
     def get_interpretation(self, planet, sign, house):
-        if not TrainingDataLoader._data:
-            return None
-        
-        for entry in TrainingDataLoader._data:
-            instruction = entry.get("instruction", "")
-            output = entry.get("output", "")
-            
-            if planet in instruction and sign in instruction and f"(House {house})" in instruction:
-                return output
-        
-        for entry in TrainingDataLoader._data:
-            instruction = entry.get("instruction", "")
-            output = entry.get("output", "")
-            
-            if planet in instruction and sign in instruction:
-                return output
-        
-        for entry in TrainingDataLoader._data:
-            instruction = entry.get("instruction", "")
-            output = entry.get("output", "")
-            
-            if planet in instruction and f"House {house}" in instruction:
-                return output
-        
-        return None
+        return self.data.get_interpretation(planet, sign, house)
     
     def get_random_general(self):
-        general_entries = [e.get("output", "") for e in TrainingDataLoader._data if "general" in e.get("instruction", "").lower()]
-        return random.choice(general_entries) if general_entries else "Your chart reflects a unique cosmic signature."
+        return random.choice(self.data.general) if self.data.general else "Your chart reflects a unique cosmic signature."
 
 
 class ImmanuelInterpreter:
@@ -479,6 +443,7 @@ class ImmanuelInterpreter:
     def __init__(self):
         self.training_data = TrainingDataLoader.get_instance()
     
+    @metrics.timed("immanuel.get_full_chart")
     def get_full_chart(self, dt, lat, lon, location_name=""):
         try:
             native = charts.Subject(
@@ -722,6 +687,7 @@ class ImmanuelInterpreter:
         
         return "\n".join(desc)
     
+    @metrics.timed("immanuel.generate_reading")
     def generate_reading(self, chart_data, fol_hits):
         reading = []
         reading.append("╔═══════════════════════════════════════════╗")
@@ -0,0 +1,48 @@
+"""
+Shared cache for LLM interpretations.
+
+Readings are expensive (seconds of GPU time) and identical charts ask for
+identical text, so finished readings are kept in a TieredCache: a small
+byte-bounded LRU in each worker in front of the SQLite file every worker
+shares. Stored text is zlib-compressed and the disk tier is pruned to a byte
+budget as well as a row count.
+
+LLM_CACHE_BACKEND selects the backend:
+
+    sqlite  (default) per-worker LRU + shared SQLite file
+    memory  per-worker LRU only
+    none    no caching
+"""
+
+import os
+
+from tiered_cache import TieredCache
+
+BACKENDS = ("sqlite", "memory", "none")
+
+
+def make_cache(backend=None, db_path=None):
+    """Returns a cache with get/set/stats (see TieredCache), or None when
+    caching is disabled."""
+    backend = (backend or os.environ.get("LLM_CACHE_BACKEND", "sqlite")).lower()
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown LLM cache backend: {backend}")
+    if backend == "none":
+        return None
+
+    if backend == "sqlite":
+        db_path = db_path or os.environ.get("SOULTETHER_CACHE_DB", "soultether_cache.sqlite3")
+    else:
+        db_path = None
+
+    return TieredCache(
+        "llm",
+        maxsize=int(os.environ.get("LLM_CACHE_SIZE", 256)),
+        ttl=float(os.environ.get("LLM_CACHE_TTL", 7 * 24 * 3600)) or None,
+        db_path=db_path,
+        max_rows=int(os.environ.get("LLM_CACHE_MAX_ROWS", 50000)),
+        max_memory_bytes=int(os.environ.get("LLM_CACHE_MEMORY_BYTES", 4 * 1024 * 1024)),
+        max_disk_bytes=int(os.environ.get("LLM_CACHE_DISK_BYTES", 256 * 1024 * 1024)),
+        compress_min_bytes=int(os.environ.get("LLM_CACHE_COMPRESS_MIN", 512)),
+        prune_every=50,
+    )
@@ -0,0 +1,147 @@
+"""
+Cached health state and circuit breaker for an upstream such as Ollama.
+
+    closed     upstream healthy; the last successful check is reused for
+               `check_interval` seconds, then re-probed by one caller
+    open       upstream failing; callers fail fast until the backoff expires
+    half_open  backoff expired; exactly one caller probes, the rest fail fast
+               until it reports back
+
+Each consecutive failed probe doubles the open period (with jitter) up to
+`max_backoff`. Real requests report their outcome through record_success()
+and record_failure(), so a dead upstream is noticed without extra probes.
+"""
+
+import random
+import threading
+import time
+
+import metrics
+
+CLOSED = "closed"
+HALF_OPEN = "half_open"
+OPEN = "open"
+
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+CIRCUIT_STATE = metrics.REGISTRY.gauge(
+    "soultether_upstream_circuit_state",
+    "Circuit breaker state (0 closed, 1 half-open, 2 open)",
+    labels=("upstream",),
+)
+PROBES = metrics.REGISTRY.counter(
+    "soultether_upstream_probes_total",
+    "Health probes sent to an upstream",
+    labels=("upstream", "result"),
+)
+REJECTED = metrics.REGISTRY.counter(
+    "soultether_upstream_rejected_total",
+    "Calls failed fast because the circuit was open",
+    labels=("upstream",),
+)
+FAILURES = metrics.REGISTRY.counter(
+    "soultether_upstream_failures_total",
+    "Failed calls reported to the circuit breaker",
+    labels=("upstream",),
+)
+
+
+class CircuitBreaker:
+    def __init__(self, name, probe, check_interval=30.0, failure_threshold=3,
+                 base_backoff=2.0, max_backoff=300.0):
+        self.name = name
+        self.probe = probe
+        self.check_interval = check_interval
+        self.failure_threshold = failure_threshold
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._checked_at = None
+        self._failures = 0
+        self._backoff = base_backoff
+        self._open_until = 0.0
+        self._probing = False
+        CIRCUIT_STATE.set(0, upstream=name)
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._state
+
+    def allow_request(self):
+        """True if a call may go to the upstream now. May run one probe."""
+        now = time.monotonic()
+        with self._lock:
+            if self._state == CLOSED:
+                fresh = self._checked_at is not None and now - self._checked_at < self.check_interval
+                if fresh or self._probing:
+                    return True
+            elif self._state == OPEN and now < self._open_until:
+                REJECTED.inc(upstream=self.name)
+                return False
+            elif self._probing:
+                REJECTED.inc(upstream=self.name)
+                return False
+
+            if self._state == OPEN:
+                self._set_state(HALF_OPEN)
+            self._probing = True
+
+        healthy = False
+        try:
+            healthy = bool(self.probe())
+        except Exception:
+            healthy = False
+        finally:
+            PROBES.inc(upstream=self.name, result="success" if healthy else "failure")
+            with self._lock:
+                self._probing = False
+                if not healthy:
+                    self._failures += 1
+            if healthy:
+                self.record_success()
+            else:
+                self._trip()
+
+        return healthy
+
+    def record_success(self):
+        with self._lock:
+            self._checked_at = time.monotonic()
+            self._failures = 0
+            self._backoff = self.base_backoff
+            self._set_state(CLOSED)
+
+    def record_failure(self):
+        FAILURES.inc(upstream=self.name)
+        with self._lock:
+            self._failures += 1
+            if self._state == CLOSED and self._failures < self.failure_threshold:
+                return
+        self._trip()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "state": self._state,
+                "consecutive_failures": self._failures,
+                "retry_in": max(0.0, round(self._open_until - time.monotonic(), 3)) if self._state != CLOSED else 0.0,
+            }
+
+    def _trip(self):
+        with self._lock:
+            if self._state == OPEN:
+                # A late failure report must not extend an existing open period
+                return
+            if self._state == HALF_OPEN:
+                self._backoff = min(self._backoff * 2, self.max_backoff)
+            delay = self._backoff * random.uniform(0.8, 1.2)
+            self._open_until = time.monotonic() + delay
+            self._checked_at = None
+            self._set_state(OPEN)
+
+    def _set_state(self, state):
+        self._state = state
+        CIRCUIT_STATE.set(_STATE_VALUES[state], upstream=self.name)
@@ -1,13 +1,21 @@
 import requests
 import json
 import hashlib
-from threading import Lock
 import os
+import time
+
+import http_pool
+import llm_cache
+import llm_health
+import metrics
+import prompt_builder
+import singleflight
+from tiered_cache import MISS
+from training_data import get_training_data
 
 
 class TrainingDataLoader:
     _instance = None
-    _data = None
     
     @classmethod
     def get_instance(cls):
@@ -16,56 +24,58 @@ class TrainingDataLoader:
         return cls._instance
     
     def __init__(self):
-        if TrainingDataLoader._data is None:
-            try:
-                data_path = os.path.join(os.path.dirname(__file__), "astrology_training_data.json")
-                if os.path.exists(data_path):
-                    with open(data_path, 'r') as f:
-                        TrainingDataLoader._data = json.load(f)
-                        print(f"✓ Loaded {len(TrainingDataLoader._data)} training interpretations")
-                else:
-                    TrainingDataLoader._data = []
-                    print("⚠ Training data file not found")
-            except Exception as e:
-                TrainingDataLoader._data = []
-                print(f"⚠ Error loading training data: {e}")
+        self.data = get_training_data()
     
     def get_interpretations_for_chart(self, chart_data, max_results=20):
-        if not TrainingDataLoader._data:
-            return {}
-        
         interpretations = {}
         planets = chart_data.get("planets", {})
         
         for planet_name, planet_data in planets.items():
             key = f"{planet_name}_{planet_data['sign']}_H{planet_data['house']}"
-            
-            for entry in TrainingDataLoader._data:
-                instruction = entry.get("instruction", "")
-                output = entry.get("output", "")
-                
-                if planet_name in instruction and planet_data['sign'] in instruction and f"House {planet_data['house']}" in instruction:
-                    interpretations[key] = output
-                    break
+            output = self.data.get_exact(planet_name, planet_data['sign'], planet_data['house'])
+            if output is not None:
+                interpretations[key] = output
         
         return interpretations
 
 
+FIRST_TOKEN_SECONDS = metrics.REGISTRY.histogram(
+    "soultether_llm_first_token_seconds",
+    "Time from sending a streaming generation to its first token",
+)
+
+
+class LLMStreamError(Exception):
+    pass
+
+
 class AstrologyLLMInterpreter:
-    def __init__(self, model_name="mixtral", ollama_url="http://localhost:11434", cache_enabled=True):
+    def __init__(self, model_name="mixtral", ollama_url="http://localhost:11434", cache_enabled=True, cache=None):
         self.model_name = model_name
         self.ollama_url = ollama_url
         self.endpoint = f"{ollama_url}/api/generate"
-        self.cache = {} if cache_enabled else None
-        self.cache_lock = Lock()
+        if not cache_enabled:
+            self.cache = None
+        else:
+            self.cache = cache if cache is not None else llm_cache.make_cache()
+        # Identical concurrent requests share one generation; with a shared
+        # cache file this extends across workers
+        self.flights = singleflight.SingleFlight("llm", db_path=getattr(self.cache, "db_path", None))
         self.training_data = TrainingDataLoader.get_instance()
+        self.health = llm_health.CircuitBreaker(
+            "ollama",
+            self._probe,
+            check_interval=float(os.environ.get("OLLAMA_HEALTH_INTERVAL", 30)),
+            failure_threshold=int(os.environ.get("OLLAMA_FAILURE_THRESHOLD", 3)),
+            max_backoff=float(os.environ.get("OLLAMA_MAX_BACKOFF", 300)),
+        )
         
+    def _probe(self):
+        response = http_pool.get("ollama_probe", f"{self.ollama_url}/api/tags")
+        return response.status_code == 200
+    
     def is_available(self):
-        try:
-            response = requests.get(f"{self.ollama_url}/api/tags", timeout=2)
-            return response.status_code == 200
-        except:
-            return False
+        return self.health.allow_request()
     
     def _get_cache_key(self, chart_data, fol_hits):
         data = {
@@ -76,111 +86,158 @@ class AstrologyLLMInterpreter:
         }
         return hashlib.md5(json.dumps(data, sort_keys=True).encode()).hexdigest()
     
+    def _cache_get(self, cache_key):
+        if self.cache is None:
+            return None
+        # The cache is shared by every model, so readings are namespaced per model
+        result = self.cache.get(f"{self.model_name}:{cache_key}")
+        return None if result is MISS else result
+    
+    def _cache_put(self, cache_key, result):
+        if self.cache is None or not result:
+            return
+        self.cache.set(f"{self.model_name}:{cache_key}", result)
+    
+    def _payload(self, prompt, max_tokens, stream):
+        return {
+            "model": self.model_name,
+            "prompt": prompt,
+            "stream": stream,
+            "temperature": 0.75,
+            "top_p": 0.95,
+            "top_k": 50,
+            "num_predict": max_tokens,
+        }
+    
+    def _flight_key(self, cache_key):
+        return f"{self.model_name}:{cache_key}"
+    
     def interpret_chart(self, chart_data, fol_hits, max_tokens=2048):
+        cache_key = self._get_cache_key(chart_data, fol_hits)
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            return cached
+        
         if not self.is_available():
             return None
         
-        if self.cache is not None:
-            cache_key = self._get_cache_key(chart_data, fol_hits)
-            with self.cache_lock:
-                if cache_key in self.cache:
-                    return self.cache[cache_key]
-        
         prompt = self._build_prompt(chart_data, fol_hits)
         
         try:
-            response = requests.post(
-                self.endpoint,
-                json={
-                    "model": self.model_name,
-                    "prompt": prompt,
-                    "stream": False,
-                    "temperature": 0.75,
-                    "top_p": 0.95,
-                    "top_k": 50,
-                    "num_predict": max_tokens,
-                },
-                timeout=120
+            return self.flights.do(
+                self._flight_key(cache_key),
+                lambda: self._generate(cache_key, prompt, max_tokens),
+                lambda: self._cache_get(cache_key),
             )
-            
-            if response.status_code == 200:
-                result = response.json().get("response", "").strip()
-                
-                if self.cache is not None:
-                    with self.cache_lock:
-                        if len(self.cache) >= 100:
-                            oldest_key = next(iter(self.cache))
-                            del self.cache[oldest_key]
-                        self.cache[cache_key] = result
-                
-                return result
         except requests.Timeout:
             return "⏱ LLM interpretation timeout (model processing took too long)"
         except Exception as e:
             return f"LLM Error: {str(e)}"
+    
+    def _generate(self, cache_key, prompt, max_tokens):
+        try:
+            response = http_pool.post(
+                "ollama",
+                self.endpoint,
+                json=self._payload(prompt, max_tokens, stream=False),
+            )
+        except requests.ConnectionError:
+            self.health.record_failure()
+            raise
+        
+        if response.status_code >= 500:
+            self.health.record_failure()
+        elif response.status_code == 200:
+            self.health.record_success()
+            result = response.json().get("response", "").strip()
+            self._cache_put(cache_key, result)
+            return result
         
         return None
     
-    def _build_prompt(self, chart_data, fol_hits):
-        planets_str = "\n".join([
-            f"  • {name}: {data['sign']} {data['deg']:.1f}° (House {data['house']})"
-            for name, data in chart_data["planets"].items()
-            if name in ["Sun", "Moon", "Mercury", "Venus", "Mars", "Jupiter", "Saturn", "Uranus", "Neptune", "Pluto"]
-        ])
+    def interpret_chart_stream(self, chart_data, fol_hits, max_tokens=2048):
+        """Returns an iterator of text chunks as Ollama generates them, or None
+        if the model is unavailable. The full text is cached once the stream
+        completes; a cached reading is returned as a single chunk. Concurrent
+        streams for the same chart share one generation."""
+        cache_key = self._get_cache_key(chart_data, fol_hits)
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            return iter([cached])
         
-        fol_str = ""
-        if fol_hits:
-            fol_str = "\n\nFlower of Life Alignments (Sacred Geometry Nodes @ ~18.95° intervals):\n"
-            for hit in fol_hits[:6]:
-                fol_str += f"  ★ {hit['name']} @ FOL Node {hit['node']:.1f}° (Orb: {hit['orb']:.2f}°, {hit['sign']})\n"
+        if not self.is_available():
+            return None
         
-        training_interps = self.training_data.get_interpretations_for_chart(chart_data)
-        training_str = ""
-        if training_interps:
-            training_str = "\n\nKEY INTERPRETATIONS REFERENCE (use these as foundation to expand upon):\n"
-            for i, (key, interp) in enumerate(list(training_interps.items())[:8], 1):
-                training_str += f"  {i}. {interp}\n"
+        prompt = self._build_prompt(chart_data, fol_hits)
+        return self._coalesced_stream(self.flights.stream(
+            self._flight_key(cache_key),
+            lambda: self._stream(cache_key, prompt, max_tokens),
+            lambda: self._cache_get(cache_key),
+        ))
+    
+    def _coalesced_stream(self, chunks):
+        try:
+            yield from chunks
+        except singleflight.SingleFlightError as e:
+            raise LLMStreamError(str(e)) from e
+    
+    def _stream(self, cache_key, prompt, max_tokens):
+        started = time.perf_counter()
+        parts = []
         
-        prompt = f"""You are a masterful astrological interpreter specializing in sacred geometry, the Flower of Life, and deep natal chart analysis. Your interpretations are comprehensive, poetic, psychologically insightful, and comparable in depth to ChatGPT or Grok astrological readings.
-
-NATAL CHART:
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-Birth: {chart_data['birth']}
-Location: {chart_data['location_name']}
-Ascendant: {chart_data['asc']} | Midheaven: {chart_data['mc']}
-
-PLANETARY POSITIONS (Tropical):
-{planets_str}
-{fol_str}{training_str}
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-
-COMPREHENSIVE INTERPRETATION GUIDELINES:
-
-STRUCTURE:
-1. SOUL BLUEPRINT - Interpret the Flower of Life alignments. What cosmic geometry is activating? What is the sacred pattern revealing about this soul's incarnational purpose?
-2. CORE IDENTITY - Analyze the Sun, Moon, and Rising signs. How do they blend? What inner conflicts or harmonies exist?
-3. RELATIONAL PATTERNS - Deep dive into 7th House and Venus. How does this person love? What relationship dynamics repeat?
-4. INNER DRIVE & WILL - Mars placement and personal agency. What fuels this soul? Where does ambition focus?
-5. SHADOWS & GROWTH - Saturn and challenging aspects. What are the soul lessons? Where is mastery being cultivated?
-6. SPIRITUAL DIMENSION - Neptune, Pluto, North Node. What mystical dimensions are active? Where is spiritual evolution calling?
-7. SYNTHESIS - How do all pieces integrate? What is the overarching life theme?
-
-TONE: Mystical, profound, psychologically sophisticated, poetic yet grounded. Speak with authority and insight. Include both spiritual and psychological dimensions. Make it feel personally relevant and transformative.
-
-LENGTH: 5-8 substantial paragraphs, each 5-7 sentences. Aim for depth, nuance, and comprehensive coverage like premium astrology services provide.
-
-DEPTH REQUIREMENTS:
-- Go beyond surface descriptions
-- Weave planetary aspects and house placements together meaningfully
-- Connect spiritual themes to practical life manifestation
-- Use vivid, evocative language that resonates on multiple levels
-- Reference timing, cycles, and evolutionary arcs where relevant
-- Acknowledge paradoxes and integrate shadow work
-- Expand on and synthesize the interpretations provided above
-
-Generate a comprehensive, extensive natal chart interpretation now:"""
-
-        return prompt
+        try:
+            # The upstream's read timeout applies per chunk when streaming
+            with http_pool.post(
+                "ollama",
+                self.endpoint,
+                json=self._payload(prompt, max_tokens, stream=True),
+                stream=True,
+            ) as response:
+                if response.status_code != 200:
+                    if response.status_code >= 500:
+                        self.health.record_failure()
+                    raise LLMStreamError(f"Ollama returned HTTP {response.status_code}")
+                
+                self.health.record_success()
+                for line in response.iter_lines():
+                    if not line:
+                        continue
+                    try:
+                        chunk = json.loads(line)
+                    except ValueError as e:
+                        self.health.record_failure()
+                        raise LLMStreamError("Ollama sent a malformed stream chunk") from e
+                    if chunk.get("error"):
+                        raise LLMStreamError(chunk["error"])
+                    
+                    text = chunk.get("response", "")
+                    if text:
+                        if not parts:
+                            FIRST_TOKEN_SECONDS.observe(time.perf_counter() - started)
+                        parts.append(text)
+                        yield text
+                    
+                    if chunk.get("done"):
+                        break
+                else:
+                    raise LLMStreamError("Ollama closed the stream before it was done")
+        except requests.exceptions.ChunkedEncodingError as e:
+            self.health.record_failure()
+            raise LLMStreamError("Ollama closed the stream before it was done") from e
+        except requests.ConnectionError as e:
+            self.health.record_failure()
+            raise LLMStreamError(str(e)) from e
+        except requests.Timeout as e:
+            raise LLMStreamError("LLM interpretation timeout (model processing took too long)") from e
+        
+        self._cache_put(cache_key, "".join(parts).strip())
+    
+    def _build_prompt(self, chart_data, fol_hits):
+        return prompt_builder.build_prompt(
+            chart_data,
+            fol_hits,
+            self.training_data.get_interpretations_for_chart(chart_data),
+        )
 
 
 class LLMInterpretationMode:
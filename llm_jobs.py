@@ -0,0 +1,276 @@
+"""
+Persistent queue for LLM interpretation jobs.
+
+Requests enqueue a job and return immediately; a small pool of threads in
+each worker drains the queue, so no request thread is held for the length
+of a generation. Jobs live in SQLite, so they survive restarts and any
+worker can report on any job.
+
+    queued   waiting; claimed highest priority first, then oldest first
+    running  claimed by a worker (host:pid in `owner`)
+    done     result holds the JSON returned by the runner
+    failed   error holds the message
+
+The number of jobs running at once is limited across all workers that
+share the database, since Ollama serialises generations anyway. Jobs left
+running by a dead worker are put back in the queue.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+import metrics
+from singleflight import owner_alive, owner_id
+
+logger = logging.getLogger(__name__)
+
+PRIORITIES = {"low": 0, "normal": 1, "high": 2}
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+WAIT_SECONDS = metrics.REGISTRY.histogram(
+    "soultether_llm_job_wait_seconds",
+    "Time jobs spend queued before a worker claims them",
+    buckets=(0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0),
+)
+RUN_SECONDS = metrics.REGISTRY.histogram(
+    "soultether_llm_job_run_seconds",
+    "Time spent generating a job's result",
+    buckets=(0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0),
+)
+JOBS = metrics.REGISTRY.counter(
+    "soultether_llm_jobs_total",
+    "Jobs by outcome (rejected means the queue was full)",
+    labels=("result",),
+)
+QUEUE_DEPTH = metrics.REGISTRY.gauge(
+    "soultether_llm_jobs",
+    "Jobs currently in the queue by status",
+    labels=("status",),
+)
+
+
+class QueueFull(Exception):
+    pass
+
+
+class JobQueue:
+    def __init__(self, db_path, runner, concurrency=1, max_depth=100,
+                 result_ttl=3600.0, poll_interval=1.0):
+        self.db_path = db_path
+        self.runner = runner
+        self.concurrency = concurrency
+        self.max_depth = max_depth
+        self.result_ttl = result_ttl
+        self.poll_interval = poll_interval
+
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._wake = threading.Event()
+        self._workers_pid = None
+        metrics.REGISTRY.register_collector(self._collect)
+
+    def submit(self, payload, priority="normal"):
+        """Queues payload for the runner and returns the job id. Raises
+        QueueFull when max_depth jobs are already waiting."""
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority: {priority}")
+        self.start()
+
+        job_id = uuid.uuid4().hex
+        conn = self._connection()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            (depth,) = conn.execute("SELECT COUNT(*) FROM jobs WHERE status = ?", (QUEUED,)).fetchone()
+            if depth >= self.max_depth:
+                JOBS.inc(result="rejected")
+                raise QueueFull(f"Interpretation queue is full ({depth} jobs waiting)")
+            conn.execute(
+                "INSERT INTO jobs (id, status, priority, payload, created_at) VALUES (?, ?, ?, ?, ?)",
+                (job_id, QUEUED, PRIORITIES[priority], json.dumps(payload), time.time()),
+            )
+        JOBS.inc(result="queued")
+        self._wake.set()
+        return job_id
+
+    def get(self, job_id):
+        """Returns the job's status dict, or None for an unknown (or expired) id."""
+        self.start()
+        row = self._connection().execute(
+            "SELECT id, status, priority, result, error, created_at, started_at, finished_at"
+            " FROM jobs WHERE id = ?",
+            (job_id,),
+        ).fetchone()
+        if row is None:
+            return None
+
+        job_id, status, priority, result, error, created_at, started_at, finished_at = row
+        job = {
+            "id": job_id,
+            "status": status,
+            "priority": next(name for name, value in PRIORITIES.items() if value == priority),
+            "created_at": created_at,
+            "started_at": started_at,
+            "finished_at": finished_at,
+        }
+        if status == QUEUED:
+            job["position"] = self._position(priority, created_at)
+        if result is not None:
+            job["result"] = json.loads(result)
+        if error is not None:
+            job["error"] = error
+        return job
+
+    def stats(self):
+        rows = self._connection().execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        counts = {status: 0 for status in (QUEUED, RUNNING, DONE, FAILED)}
+        counts.update(rows)
+        return {**counts, "max_depth": self.max_depth, "concurrency": self.concurrency}
+
+    def start(self):
+        """Starts this process's worker threads (once per pid, so the queue
+        is drained by every forked worker)."""
+        with self._lock:
+            if self._workers_pid == os.getpid():
+                return
+            self._workers_pid = os.getpid()
+            self._wake = threading.Event()
+            for i in range(self.concurrency):
+                threading.Thread(target=self._work, name=f"llm-job-{i}", daemon=True).start()
+
+    def _connection(self):
+        # One connection per thread; the worker pid check keeps forked
+        # children from reusing their parent's
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+
+        conn = sqlite3.connect(self.db_path, timeout=10, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " id TEXT PRIMARY KEY,"
+            " status TEXT NOT NULL,"
+            " priority INTEGER NOT NULL,"
+            " payload TEXT NOT NULL,"
+            " result TEXT,"
+            " error TEXT,"
+            " owner TEXT,"
+            " created_at REAL NOT NULL,"
+            " started_at REAL,"
+            " finished_at REAL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS jobs_queue ON jobs (status, priority DESC, created_at)")
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
+
+    def _position(self, priority, created_at):
+        (ahead,) = self._connection().execute(
+            "SELECT COUNT(*) FROM jobs WHERE status = ? AND (priority > ? OR (priority = ? AND created_at < ?))",
+            (QUEUED, priority, priority, created_at),
+        ).fetchone()
+        return ahead + 1
+
+    def _claim(self):
+        """Atomically moves the next queued job to running, unless the shared
+        concurrency limit is reached. Returns (id, payload, created_at) or None."""
+        conn = self._connection()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            (running,) = conn.execute("SELECT COUNT(*) FROM jobs WHERE status = ?", (RUNNING,)).fetchone()
+            if running >= self.concurrency:
+                return None
+            row = conn.execute(
+                "SELECT id, payload, created_at FROM jobs WHERE status = ?"
+                " ORDER BY priority DESC, created_at LIMIT 1",
+                (QUEUED,),
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = ?, owner = ?, started_at = ? WHERE id = ?",
+                (RUNNING, owner_id(), time.time(), row[0]),
+            )
+        return row[0], json.loads(row[1]), row[2]
+
+    def _finish(self, job_id, result=None, error=None):
+        with self._connection() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ? WHERE id = ?",
+                (
+                    FAILED if error is not None else DONE,
+                    json.dumps(result) if error is None else None,
+                    error,
+                    time.time(),
+                    job_id,
+                ),
+            )
+
+    def _recover(self):
+        """Requeues jobs whose worker died and drops expired results."""
+        conn = self._connection()
+        for job_id, owner in conn.execute("SELECT id, owner FROM jobs WHERE status = ?", (RUNNING,)).fetchall():
+            if owner and not owner_alive(owner):
+                logger.warning(f"Requeueing LLM job {job_id} abandoned by {owner}")
+                with conn:
+                    conn.execute(
+                        "UPDATE jobs SET status = ?, owner = NULL, started_at = NULL WHERE id = ? AND owner = ?",
+                        (QUEUED, job_id, owner),
+                    )
+        with conn:
+            conn.execute(
+                "DELETE FROM jobs WHERE status IN (?, ?) AND finished_at < ?",
+                (DONE, FAILED, time.time() - self.result_ttl),
+            )
+
+    def _work(self):
+        last_recovery = 0.0
+        while True:
+            try:
+                if time.monotonic() - last_recovery > 60:
+                    self._recover()
+                    last_recovery = time.monotonic()
+                job = self._claim()
+            except sqlite3.Error as e:
+                logger.warning(f"LLM job queue error: {e}")
+                job = None
+
+            if job is None:
+                self._wake.wait(self.poll_interval)
+                self._wake.clear()
+                continue
+
+            job_id, payload, created_at = job
+            WAIT_SECONDS.observe(max(0.0, time.time() - created_at))
+            started = time.perf_counter()
+            try:
+                result, error = self.runner(payload), None
+            except Exception as e:
+                logger.error(f"LLM job {job_id} failed: {str(e)}")
+                result, error = None, str(e)
+            RUN_SECONDS.observe(time.perf_counter() - started)
+            JOBS.inc(result="failed" if error is not None else "done")
+
+            try:
+                self._finish(job_id, result, error)
+            except sqlite3.Error as e:
+                logger.warning(f"LLM job queue error: {e}")
+            # Another job may be waiting now that a slot is free
+            self._wake.set()
+
+    def _collect(self):
+        try:
+            for status, count in self.stats().items():
+                if status in (QUEUED, RUNNING):
+                    QUEUE_DEPTH.set(count, status=status)
+        except sqlite3.Error:
+            pass
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Load test for the reading and LLM interpretation endpoints.
+
+Runs `--concurrency` clients against a running app for `--duration` seconds
+(or `--requests` in total). Each request uses one of `--subjects` birth
+charts, so the repeat rate (and therefore the cache hit rate) is tunable.
+Afterwards it reports throughput, latency percentiles, status codes, and the
+change in the app's /metrics cache, coalescing and queue counters during the
+run.
+
+Modes:
+    reading  POST /calculate_reading
+    stream   POST /interpret_stream, also timing the first token event
+    jobs     POST /interpretations, then poll until each job finishes
+
+Example, with no GPU (fake_ollama.py stands in for the model):
+    python fake_ollama.py --latency 1 --tokens-per-second 30 &
+    gunicorn app:app --worker-class gthread --threads 8 -w 2 &
+    python loadtest.py --mode stream --concurrency 16 --duration 60 --subjects 20
+
+Locations are taken from --locations; keep the list short (or build the
+offline gazetteer) so geocoding is served from cache rather than the
+network.
+"""
+
+import argparse
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import date, timedelta
+
+import requests
+
+LOCATIONS = ["New York, NY", "London, UK", "Tokyo, Japan", "Sydney, Australia", "Paris, France"]
+
+METRIC_LINE = re.compile(r'^(\w+)(?:\{(.*)\})? ([0-9.eE+-]+|NaN)$')
+
+# Counters reported as before/after deltas
+REPORTED = (
+    "soultether_cache_requests_total",
+    "soultether_singleflight_total",
+    "soultether_llm_jobs_total",
+    "soultether_upstream_rejected_total",
+    "soultether_http_requests_total",
+    "soultether_http_connections_total",
+    "soultether_llm_job_wait_seconds_sum",
+    "soultether_llm_job_wait_seconds_count",
+    "soultether_llm_job_run_seconds_sum",
+    "soultether_llm_job_run_seconds_count",
+    "soultether_llm_first_token_seconds_sum",
+    "soultether_llm_first_token_seconds_count",
+)
+
+
+def make_subjects(count, locations, seed):
+    rng = random.Random(seed)
+    subjects = []
+    for _ in range(count):
+        birth = date(1950, 1, 1) + timedelta(days=rng.randrange(365 * 55))
+        subjects.append({
+            "birth_date": birth.isoformat(),
+            "hour": rng.randint(1, 12),
+            "minute": rng.randrange(60),
+            "is_am": rng.random() < 0.5,
+            "location": rng.choice(locations),
+        })
+    return subjects
+
+
+def scrape(base_url):
+    """Returns {(name, labels): value} for the reported counters, or {} if
+    /metrics is unreachable."""
+    try:
+        text = requests.get(f"{base_url}/metrics", timeout=10).text
+    except requests.RequestException:
+        return {}
+
+    values = {}
+    for line in text.splitlines():
+        match = METRIC_LINE.match(line)
+        if match and match.group(1) in REPORTED:
+            values[(match.group(1), match.group(2) or "")] = float(match.group(3))
+    return values
+
+
+def percentile(values, p):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+
+class Results:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = []
+        self.first_tokens = []
+        self.queue_waits = []
+        self.statuses = Counter()
+        self.outcomes = Counter()
+
+    def record(self, latency, status, outcome=None, first_token=None, queue_wait=None):
+        with self.lock:
+            self.latencies.append(latency)
+            self.statuses[status] += 1
+            if outcome:
+                self.outcomes[outcome] += 1
+            if first_token is not None:
+                self.first_tokens.append(first_token)
+            if queue_wait is not None:
+                self.queue_waits.append(queue_wait)
+
+
+def run_reading(session, base_url, subject, results):
+    started = time.perf_counter()
+    response = session.post(f"{base_url}/calculate_reading", json=subject, timeout=60)
+    results.record(time.perf_counter() - started, response.status_code)
+
+
+def run_stream(session, base_url, subject, results):
+    started = time.perf_counter()
+    first_token = None
+    outcome = None
+    with session.post(f"{base_url}/interpret_stream", json=subject, stream=True, timeout=(5, 300)) as response:
+        if response.status_code == 200:
+            for line in response.iter_lines(decode_unicode=True):
+                if not line or not line.startswith("event: "):
+                    continue
+                event = line[len("event: "):]
+                if event == "token" and first_token is None:
+                    first_token = time.perf_counter() - started
+                if event in ("done", "fallback", "error"):
+                    outcome = event
+    results.record(time.perf_counter() - started, response.status_code, outcome, first_token)
+
+
+def run_job(session, base_url, subject, results, poll_interval=0.25):
+    started = time.perf_counter()
+    response = session.post(f"{base_url}/interpretations", json=subject, timeout=30)
+    if response.status_code != 202:
+        results.record(time.perf_counter() - started, response.status_code, "rejected" if response.status_code == 429 else None)
+        return
+
+    job_id = response.json()["job_id"]
+    while True:
+        time.sleep(poll_interval)
+        job = session.get(f"{base_url}/interpretations/{job_id}", timeout=30).json()
+        if job.get("status") in ("done", "failed"):
+            break
+    wait = job["started_at"] - job["created_at"] if job.get("started_at") else None
+    outcome = job["status"] if job["status"] == "failed" else job["result"]["source"]
+    results.record(time.perf_counter() - started, 202, outcome, queue_wait=wait)
+
+
+RUNNERS = {"reading": run_reading, "stream": run_stream, "jobs": run_job}
+
+
+def worker(args, subjects, results, deadline, remaining, lock, rng):
+    session = requests.Session()
+    run = RUNNERS[args.mode]
+    while time.monotonic() < deadline:
+        with lock:
+            if remaining[0] == 0:
+                return
+            remaining[0] -= 1
+        try:
+            run(session, args.url, rng.choice(subjects), results)
+        except requests.RequestException as e:
+            results.record(0.0, type(e).__name__)
+
+
+def report(args, results, elapsed, before, after):
+    done = len(results.latencies)
+    print(f"\n{args.mode}: {done} requests in {elapsed:.1f}s with {args.concurrency} clients "
+          f"= {done / elapsed:.2f} req/s")
+    print("status:", ", ".join(f"{status}={count}" for status, count in sorted(results.statuses.items(), key=str)))
+    if results.outcomes:
+        print("outcome:", ", ".join(f"{name}={count}" for name, count in sorted(results.outcomes.items())))
+
+    for name, values in (("latency", results.latencies), ("first token", results.first_tokens),
+                         ("queue wait", results.queue_waits)):
+        if values:
+            print(f"{name:>12}: p50 {percentile(values, 50):.3f}s  p90 {percentile(values, 90):.3f}s  "
+                  f"p99 {percentile(values, 99):.3f}s  max {max(values):.3f}s")
+
+    delta = {key: after.get(key, 0.0) - before.get(key, 0.0) for key in after}
+    if not delta:
+        print("\n(/metrics unavailable; no server-side counters)")
+        return
+
+    caches = {}
+    for (name, labels), value in delta.items():
+        if name == "soultether_cache_requests_total":
+            fields = dict(re.findall(r'(\w+)="([^"]*)"', labels))
+            caches.setdefault(fields["cache"], Counter())[fields["result"]] += value
+    if caches:
+        print("\ncache hit rates during the run (this scrape's worker):")
+        for cache, counts in sorted(caches.items()):
+            total = sum(counts.values())
+            hits = total - counts["miss"]
+            print(f"  {cache:>10}: {hits / total:.1%} of {int(total)}" if total else f"  {cache:>10}: no lookups")
+
+    print("\nserver counters (delta):")
+    for (name, labels), value in sorted(delta.items()):
+        if value:
+            print(f"  {name}{{{labels}}} {value:g}" if labels else f"  {name} {value:g}")
+
+    waits = delta.get(("soultether_llm_job_wait_seconds_count", ""), 0)
+    if waits:
+        print(f"\nmean job queue wait {delta[('soultether_llm_job_wait_seconds_sum', '')] / waits:.3f}s, "
+              f"mean generation {delta[('soultether_llm_job_run_seconds_sum', '')] / waits:.3f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test SoulTether's reading and LLM endpoints")
+    parser.add_argument("--url", default="http://127.0.0.1:5000")
+    parser.add_argument("--mode", choices=sorted(RUNNERS), default="stream")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds to run")
+    parser.add_argument("--requests", type=int, default=-1, help="stop after this many requests")
+    parser.add_argument("--subjects", type=int, default=50, help="distinct charts to draw from")
+    parser.add_argument("--locations", nargs="+", default=LOCATIONS)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    args.url = args.url.rstrip("/")
+
+    subjects = make_subjects(args.subjects, args.locations, args.seed)
+    results = Results()
+    remaining = [args.requests]
+    lock = threading.Lock()
+
+    before = scrape(args.url)
+    started = time.monotonic()
+    deadline = started + args.duration
+    threads = [
+        threading.Thread(target=worker, args=(args, subjects, results, deadline, remaining, lock, random.Random(args.seed + i)))
+        for i in range(args.concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+    after = scrape(args.url)
+
+    if not results.latencies:
+        print("No requests completed", file=sys.stderr)
+        return 1
+    report(args, results, elapsed, before, after)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,244 @@
+"""
+Minimal in-process metrics: counters, gauges and histograms rendered in the
+Prometheus text exposition format, plus per-request stage spans used for the
+Server-Timing header.
+
+Metrics are per process. Under gunicorn each worker reports its own values,
+so scrape every worker (or aggregate by instance) when capacity planning.
+"""
+
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+
+# Seconds; tuned for stages between ~1ms (cache hits) and remote geocoding/LLM calls
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_spans = contextvars.ContextVar("metrics_spans", default=None)
+
+
+def _format_labels(names, values, extra=None):
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value)) if abs(value) < 1e15 else repr(value)
+    return repr(value)
+
+
+class _Metric:
+    type = None
+
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        if set(labels) != set(self.labels):
+            raise ValueError(f"{self.name} expects labels {self.labels}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labels)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.extend(self._render_sample(key, value))
+        return lines
+
+    def _render_sample(self, key, value):
+        return [f"{self.name}{_format_labels(self.labels, key)} {_format_value(value)}"]
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def set_total(self, value, **labels):
+        """Mirrors a cumulative count kept elsewhere (used by collectors)."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def value(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+
+class Gauge(_Metric):
+    type = "gauge"
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def value(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, name, help_text, labels=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0, 0.0]
+            counts = state[0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            state[1] += 1
+            state[2] += value
+
+    def snapshot(self, **labels):
+        """Returns {"count", "sum"} for one label set."""
+        state = self._values.get(self._key(labels))
+        if state is None:
+            return {"count": 0, "sum": 0.0}
+        return {"count": state[1], "sum": state[2]}
+
+    def _render_sample(self, key, state):
+        counts, count, total = state
+        lines = []
+        cumulative = 0
+        for bound, n in zip(self.buckets, counts):
+            cumulative += n
+            labels = _format_labels(self.labels, key, ("le", _format_value(float(bound))))
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = _format_labels(self.labels, key, ("le", "+Inf"))
+        lines.append(f"{self.name}_bucket{labels} {count}")
+        lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {_format_value(total)}")
+        lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {count}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name, help_text, labels, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help_text, labels, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metric {name} already registered as {metric.type}")
+            return metric
+
+    def counter(self, name, help_text, labels=()):
+        return self._get_or_create(Counter, name, help_text, labels)
+
+    def gauge(self, name, help_text, labels=()):
+        return self._get_or_create(Gauge, name, help_text, labels)
+
+    def histogram(self, name, help_text, labels=(), buckets=LATENCY_BUCKETS):
+        return self._get_or_create(Histogram, name, help_text, labels, buckets=buckets)
+
+    def register_collector(self, collector):
+        """Adds a callable run at scrape time, for values that live elsewhere
+        (e.g. cache stats). It may update metrics or return extra text lines."""
+        with self._lock:
+            self._collectors.append(collector)
+
+    def render(self):
+        lines = []
+        for collector in list(self._collectors):
+            extra = collector()
+            if extra:
+                lines.extend(extra)
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda m: m.name)
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+STAGE_SECONDS = REGISTRY.histogram(
+    "soultether_stage_seconds",
+    "Time spent in each stage of the reading pipeline",
+    labels=("stage",),
+)
+STAGE_ERRORS = REGISTRY.counter(
+    "soultether_stage_errors_total",
+    "Stages that raised an exception",
+    labels=("stage",),
+)
+
+
+def start_spans():
+    """Starts collecting stage spans for the current request context."""
+    spans = []
+    _spans.set(spans)
+    return spans
+
+
+def stop_spans():
+    spans = _spans.get()
+    _spans.set(None)
+    return spans or []
+
+
+@contextmanager
+def timed(stage):
+    """Times a block (or, as a decorator, a call) into soultether_stage_seconds
+    and records it as a span if the current request is collecting them."""
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        STAGE_ERRORS.inc(stage=stage)
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_SECONDS.observe(elapsed, stage=stage)
+        spans = _spans.get()
+        if spans is not None:
+            spans.append((stage, elapsed))
+
+
+def record_spans(spans):
+    """Records stage timings measured elsewhere (e.g. in a pool process) as
+    if they had been timed here."""
+    current = _spans.get()
+    for stage, elapsed in spans:
+        STAGE_SECONDS.observe(elapsed, stage=stage)
+        if current is not None:
+            current.append((stage, elapsed))
+
+
+def server_timing(spans):
+    """Formats spans as a Server-Timing header value (durations in ms)."""
+    totals = {}
+    for stage, elapsed in spans:
+        totals[stage] = totals.get(stage, 0.0) + elapsed
+    return ", ".join(
+        f"{stage.replace('.', '-')};dur={elapsed * 1000:.2f}" for stage, elapsed in totals.items()
+    )
@@ -0,0 +1,177 @@
+"""
+Builds interpretation prompts for the LLM within a token budget.
+
+The role and guidelines never change, so they come first as one constant
+string: every prompt then starts with the same tokens and Ollama can reuse
+its cached prefix instead of re-reading them. The chart, Flower of Life
+alignments and reference interpretations follow.
+
+Token counts are estimated at ~4 characters per token, which is close
+enough for budgeting English text without loading a tokenizer. Reference
+snippets are ranked (bodies with FOL alignments first, then the personal
+planets), each trimmed to SNIPPET_TOKENS, and added until the budget is
+spent.
+"""
+
+import math
+import os
+
+import metrics
+
+TOKEN_BUDGET = int(os.environ.get("LLM_PROMPT_TOKEN_BUDGET", 1200))
+MAX_SNIPPETS = 8
+SNIPPET_TOKENS = 80
+MAX_FOL_HITS = 6
+
+CHART_BODIES = ["Sun", "Moon", "Mercury", "Venus", "Mars", "Jupiter", "Saturn", "Uranus", "Neptune", "Pluto"]
+
+# Reference snippets are kept in this order when the budget is tight
+SNIPPET_RANK = [
+    "Sun", "Moon", "Ascendant", "Venus", "Mars", "Mercury",
+    "Jupiter", "Saturn", "Midheaven", "Neptune", "Uranus", "Pluto",
+]
+
+RULE = "━" * 41
+
+SYSTEM_PROMPT = """You are a masterful astrological interpreter specializing in sacred geometry, the Flower of Life, and deep natal chart analysis. Your interpretations are comprehensive, poetic, psychologically insightful, and comparable in depth to ChatGPT or Grok astrological readings.
+
+COMPREHENSIVE INTERPRETATION GUIDELINES:
+
+STRUCTURE:
+1. SOUL BLUEPRINT - Interpret the Flower of Life alignments. What cosmic geometry is activating? What is the sacred pattern revealing about this soul's incarnational purpose?
+2. CORE IDENTITY - Analyze the Sun, Moon, and Rising signs. How do they blend? What inner conflicts or harmonies exist?
+3. RELATIONAL PATTERNS - Deep dive into 7th House and Venus. How does this person love? What relationship dynamics repeat?
+4. INNER DRIVE & WILL - Mars placement and personal agency. What fuels this soul? Where does ambition focus?
+5. SHADOWS & GROWTH - Saturn and challenging aspects. What are the soul lessons? Where is mastery being cultivated?
+6. SPIRITUAL DIMENSION - Neptune, Pluto, North Node. What mystical dimensions are active? Where is spiritual evolution calling?
+7. SYNTHESIS - How do all pieces integrate? What is the overarching life theme?
+
+TONE: Mystical, profound, psychologically sophisticated, poetic yet grounded. Speak with authority and insight. Include both spiritual and psychological dimensions. Make it feel personally relevant and transformative.
+
+LENGTH: 5-8 substantial paragraphs, each 5-7 sentences. Aim for depth, nuance, and comprehensive coverage like premium astrology services provide.
+
+DEPTH REQUIREMENTS:
+- Go beyond surface descriptions
+- Weave planetary aspects and house placements together meaningfully
+- Connect spiritual themes to practical life manifestation
+- Use vivid, evocative language that resonates on multiple levels
+- Reference timing, cycles, and evolutionary arcs where relevant
+- Acknowledge paradoxes and integrate shadow work
+- Expand on and synthesize the reference interpretations provided with the chart
+"""
+
+CLOSING = f"""{RULE}
+
+Generate a comprehensive, extensive natal chart interpretation now:"""
+
+PROMPT_TOKENS = metrics.REGISTRY.histogram(
+    "soultether_llm_prompt_tokens",
+    "Estimated tokens per generated prompt, by part",
+    labels=("part",),
+    buckets=(64, 128, 256, 512, 768, 1024, 1536, 2048, 3072, 4096),
+)
+SNIPPETS_DROPPED = metrics.REGISTRY.counter(
+    "soultether_llm_prompt_snippets_dropped_total",
+    "Reference snippets left out of prompts to stay within the token budget",
+)
+
+
+def estimate_tokens(text):
+    return math.ceil(len(text) / 4)
+
+
+# The static parts are counted once
+FIXED_TOKENS = estimate_tokens(SYSTEM_PROMPT) + estimate_tokens(CLOSING)
+
+
+def trim_to_tokens(text, max_tokens):
+    """Shortens text to about max_tokens, preferring to cut at a sentence end."""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    cut = text[:max_tokens * 4]
+    end = cut.rfind(". ")
+    if end >= len(cut) // 2:
+        return cut[:end + 1]
+    return cut[:cut.rfind(" ")].rstrip(",;:") + "…"
+
+
+def rank_snippets(snippets, fol_hits):
+    """Orders {"<Body>_<Sign>_H<house>": text} by relevance to the reading."""
+    aligned = {hit["name"] for hit in fol_hits}
+
+    def rank(item):
+        body = item[0].split("_")[0]
+        order = SNIPPET_RANK.index(body) if body in SNIPPET_RANK else len(SNIPPET_RANK)
+        return (body not in aligned, order)
+
+    return sorted(snippets.items(), key=rank)
+
+
+def _chart_section(chart_data, fol_hits):
+    lines = [
+        "NATAL CHART:",
+        RULE,
+        f"Birth: {chart_data['birth']}",
+        f"Location: {chart_data['location_name']}",
+        f"Ascendant: {chart_data['asc']} | Midheaven: {chart_data['mc']}",
+        "",
+        "PLANETARY POSITIONS (Tropical):",
+    ]
+    lines.extend(
+        f"  • {name}: {data['sign']} {data['deg']:.1f}° (House {data['house']})"
+        for name, data in chart_data["planets"].items()
+        if name in CHART_BODIES
+    )
+
+    if fol_hits:
+        lines += ["", "Flower of Life Alignments (Sacred Geometry Nodes @ ~18.95° intervals):"]
+        lines.extend(
+            f"  ★ {hit['name']} @ FOL Node {hit['node']:.1f}° (Orb: {hit['orb']:.2f}°, {hit['sign']})"
+            for hit in fol_hits[:MAX_FOL_HITS]
+        )
+    return "\n".join(lines)
+
+
+def _reference_section(snippets, fol_hits, budget):
+    header = "KEY INTERPRETATIONS REFERENCE (use these as foundation to expand upon):"
+    lines = []
+    remaining = budget - estimate_tokens(header) - 1
+    ranked = rank_snippets(snippets, fol_hits)
+
+    for _, text in ranked:
+        if len(lines) == MAX_SNIPPETS:
+            break
+        line = f"  {len(lines) + 1}. {trim_to_tokens(text, SNIPPET_TOKENS)}"
+        cost = estimate_tokens(line) + 1
+        if cost > remaining:
+            break
+        lines.append(line)
+        remaining -= cost
+
+    dropped = len(ranked) - len(lines)
+    if dropped:
+        SNIPPETS_DROPPED.inc(dropped)
+    if not lines:
+        return ""
+    return "\n".join([header] + lines)
+
+
+def build_prompt(chart_data, fol_hits, snippets, token_budget=None):
+    """Returns the prompt for a chart. snippets maps "<Body>_<Sign>_H<house>"
+    keys to reference interpretations; as many as fit the budget are used."""
+    budget = token_budget if token_budget is not None else TOKEN_BUDGET
+    chart = _chart_section(chart_data, fol_hits)
+    chart_tokens = estimate_tokens(chart)
+    references = _reference_section(snippets, fol_hits, budget - FIXED_TOKENS - chart_tokens)
+
+    parts = [SYSTEM_PROMPT, chart]
+    if references:
+        parts.append(references)
+    parts.append(CLOSING)
+    prompt = "\n\n".join(parts)
+
+    PROMPT_TOKENS.observe(FIXED_TOKENS, part="system")
+    PROMPT_TOKENS.observe(chart_tokens, part="chart")
+    PROMPT_TOKENS.observe(estimate_tokens(references), part="references")
+    PROMPT_TOKENS.observe(estimate_tokens(prompt), part="total")
+    return prompt
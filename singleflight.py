@@ -0,0 +1,335 @@
+"""
+Single-flight coalescing: concurrent requests for the same key share one
+piece of work instead of each starting their own.
+
+Within a process, the first caller for a key becomes the leader and the rest
+wait on it. For streams, a background thread drains the leader's iterator
+and every subscriber (including late joiners) replays the chunks received so
+far, then follows new ones as they arrive.
+
+Across workers, the leader of each process claims a lease row in the shared
+SQLite file. The worker holding the lease generates and publishes its
+progress into the row; leaders in other workers follow that row instead of
+generating, and fan it out to their own waiters. A lease whose owner stops
+renewing it (or whose owner pid is gone on this host) is taken over.
+"""
+
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+FLIGHTS = metrics.REGISTRY.counter(
+    "soultether_singleflight_total",
+    "Coalesced calls by role (leader generates, follower/remote waits)",
+    labels=("flight", "role"),
+)
+
+
+class SingleFlightError(Exception):
+    pass
+
+
+class _Call:
+    def __init__(self):
+        self.cond = threading.Condition()
+        self.chunks = []
+        self.result = None
+        self.error = None
+        self.done = False
+
+
+class SingleFlight:
+    def __init__(self, name, db_path=None, lease_ttl=150.0, linger=5.0,
+                 poll_interval=0.1, publish_interval=0.25, max_wait=300.0):
+        self.name = name
+        self.db_path = db_path or None
+        self.lease_ttl = lease_ttl
+        self.linger = linger
+        self.poll_interval = poll_interval
+        self.publish_interval = publish_interval
+        self.max_wait = max_wait
+
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._conn = None
+        self._conn_pid = None
+        self._db_lock = threading.Lock()
+
+    def do(self, key, fn, lookup=lambda: None):
+        """Returns fn() for key, run once across concurrent callers. lookup()
+        reads a finished result (e.g. from a shared cache) when another
+        worker's lease disappears before it published one."""
+        call, leader = self._join(("do", key))
+        if leader:
+            FLIGHTS.inc(flight=self.name, role="leader")
+            try:
+                call.result = self._lease_do(key, fn, lookup)
+            except Exception as e:
+                call.error = e
+            finally:
+                self._finish(("do", key), call)
+        else:
+            FLIGHTS.inc(flight=self.name, role="follower")
+            with call.cond:
+                call.cond.wait_for(lambda: call.done)
+
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def stream(self, key, produce, lookup=lambda: None):
+        """Returns an iterator over the chunks of produce() for key. The
+        generation runs in the background, so it completes (and can be
+        cached) even if every subscriber goes away."""
+        call, leader = self._join(("stream", key))
+        if leader:
+            FLIGHTS.inc(flight=self.name, role="leader")
+            threading.Thread(
+                target=self._pump,
+                args=(("stream", key), call, self._lease_stream(key, produce, lookup)),
+                daemon=True,
+            ).start()
+        else:
+            FLIGHTS.inc(flight=self.name, role="follower")
+        return self._subscribe(call)
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._calls)
+
+    def _join(self, key):
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                return call, False
+            call = self._calls[key] = _Call()
+            return call, True
+
+    def _finish(self, key, call):
+        with self._lock:
+            self._calls.pop(key, None)
+        with call.cond:
+            call.done = True
+            call.cond.notify_all()
+
+    def _pump(self, key, call, chunks):
+        try:
+            for chunk in chunks:
+                with call.cond:
+                    call.chunks.append(chunk)
+                    call.cond.notify_all()
+        except Exception as e:
+            call.error = e
+        finally:
+            self._finish(key, call)
+
+    def _subscribe(self, call):
+        position = 0
+        while True:
+            with call.cond:
+                call.cond.wait_for(lambda: len(call.chunks) > position or call.done)
+                chunks = call.chunks[position:]
+                done = call.done
+            for chunk in chunks:
+                yield chunk
+            position += len(chunks)
+            if done:
+                if call.error is not None:
+                    raise call.error
+                return
+
+    # Cross-worker leases
+
+    def _lease_do(self, key, fn, lookup):
+        deadline = time.monotonic() + self.max_wait
+        while True:
+            if self._acquire(key):
+                result = None
+                try:
+                    result = fn()
+                    return result
+                finally:
+                    self._complete(key, result if isinstance(result, str) else None)
+
+            FLIGHTS.inc(flight=self.name, role="remote")
+            while time.monotonic() < deadline:
+                row = self._row(key)
+                if row is None or self._abandoned(row):
+                    break
+                if row[3]:
+                    return row[2]
+                time.sleep(self.poll_interval)
+            else:
+                return lookup()
+
+            result = lookup()
+            if result is not None:
+                return result
+
+    def _lease_stream(self, key, produce, lookup):
+        deadline = time.monotonic() + self.max_wait
+        seen = ""
+        while True:
+            if not seen and self._acquire(key):
+                yield from self._lead_stream(key, produce)
+                return
+
+            FLIGHTS.inc(flight=self.name, role="remote")
+            while time.monotonic() < deadline:
+                row = self._row(key)
+                if row is None or self._abandoned(row):
+                    break
+                text, done = row[2] or "", row[3]
+                if len(text) > len(seen):
+                    yield text[len(seen):]
+                    seen = text
+                if done:
+                    if row[2] is None:
+                        raise SingleFlightError("Generation failed in another worker")
+                    return
+                time.sleep(self.poll_interval)
+            else:
+                raise SingleFlightError("Timed out waiting for another worker's generation")
+
+            result = lookup()
+            if result is not None:
+                # Cached results are stripped, so match past leading whitespace
+                if result.startswith(seen.lstrip()):
+                    yield result[len(seen.lstrip()):]
+                    return
+            if seen:
+                raise SingleFlightError("Worker generating this reading stopped")
+
+    def _lead_stream(self, key, produce):
+        text = []
+        published = time.monotonic()
+        completed = False
+        try:
+            for chunk in produce():
+                text.append(chunk)
+                yield chunk
+                if time.monotonic() - published >= self.publish_interval:
+                    self._publish(key, "".join(text))
+                    published = time.monotonic()
+            completed = True
+        finally:
+            self._complete(key, "".join(text) if completed else None)
+
+    def _connection(self):
+        if self.db_path is None:
+            return None
+
+        # sqlite connections must not be shared across a fork (gunicorn workers)
+        if self._conn is not None and self._conn_pid == os.getpid():
+            return self._conn
+
+        try:
+            conn = sqlite3.connect(self.db_path, timeout=5, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS flights ("
+                " name TEXT NOT NULL,"
+                " key TEXT NOT NULL,"
+                " owner TEXT NOT NULL,"
+                " expires_at REAL NOT NULL,"
+                " text TEXT,"
+                " done INTEGER NOT NULL DEFAULT 0,"
+                " PRIMARY KEY (name, key))"
+            )
+            conn.commit()
+        except sqlite3.Error as e:
+            self._db_error(e)
+            return None
+
+        self._conn = conn
+        self._conn_pid = os.getpid()
+        return conn
+
+    def _execute(self, sql, params, fetch=False):
+        """Returns the fetched row (fetch=True) or the affected row count;
+        None if the database is unavailable."""
+        conn = self._connection()
+        if conn is None:
+            return None
+        try:
+            with self._db_lock, conn:
+                cursor = conn.execute(sql, params)
+                return cursor.fetchone() if fetch else cursor.rowcount
+        except sqlite3.Error as e:
+            self._db_error(e)
+            return None
+
+    def _acquire(self, key):
+        """True if this worker now holds the lease (or leases are unavailable)."""
+        if self._connection() is None:
+            return True
+
+        # A failed generation stays visible to the followers already waiting
+        # on it, but does not stop a new caller from trying again
+        row = self._row(key)
+        if row is not None and (self._abandoned(row) or (row[3] and row[2] is None)):
+            self._execute(
+                "DELETE FROM flights WHERE name = ? AND key = ? AND owner = ?",
+                (self.name, key, row[0]),
+            )
+        inserted = self._execute(
+            "INSERT OR IGNORE INTO flights (name, key, owner, expires_at, text, done)"
+            " VALUES (?, ?, ?, ?, '', 0)",
+            (self.name, key, owner_id(), time.time() + self.lease_ttl),
+        )
+        return inserted is None or inserted == 1
+
+    def _row(self, key):
+        return self._execute(
+            "SELECT owner, expires_at, text, done FROM flights WHERE name = ? AND key = ?",
+            (self.name, key),
+            fetch=True,
+        )
+
+    def _abandoned(self, row):
+        owner, expires_at, _, done = row
+        if expires_at <= time.time():
+            return True
+        return not done and not owner_alive(owner)
+
+    def _publish(self, key, text):
+        self._execute(
+            "UPDATE flights SET text = ?, expires_at = ? WHERE name = ? AND key = ? AND owner = ?",
+            (text, time.time() + self.lease_ttl, self.name, key, owner_id()),
+        )
+
+    def _complete(self, key, text):
+        """Marks the lease done; followers read text, or treat None as failure.
+        The row lingers briefly so polling followers can see it."""
+        self._execute(
+            "UPDATE flights SET text = ?, done = 1, expires_at = ? WHERE name = ? AND key = ? AND owner = ?",
+            (text, time.time() + self.linger, self.name, key, owner_id()),
+        )
+
+    def _db_error(self, error):
+        logger.warning(f"Single-flight '{self.name}' lease error: {error}")
+
+
+def owner_id():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def owner_alive(owner):
+    """Owners on other hosts are assumed alive until their lease expires."""
+    host, _, pid = owner.rpartition(":")
+    if host != socket.gethostname():
+        return True
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except (OSError, ValueError):
+        return True
+    return True
@@ -7,6 +7,9 @@ import random
 import threading
 from datetime import datetime
 import swisseph as swe
+import chart_math
+import fol
+import gazetteer
 from immanuel_interpreter import ImmanuelInterpreter
 from kivy.app import App
 from kivy.uix.boxlayout import BoxLayout
@@ -25,8 +28,10 @@ from kivy.clock import mainthread
 
 try:
     import requests
+    import http_pool
 except ImportError:
     requests = None
+    http_pool = None
 
 try:
     from llm_interpreter import AstrologyLLMInterpreter, LLMInterpretationMode
@@ -110,12 +115,13 @@ def get_full_chart(dt, lat, lon):
         swe.MEAN_NODE: "North Node",
     }
 
+    houses = chart_math.HouseIndex(cusps)
     planet_data = {}
     for body, name in planets.items():
         lon = swe.calc_ut(jd, body)[0][0]
         sign_idx = int(lon // 30)
         deg_in_sign = lon % 30
-        house_num = get_house_number(lon, cusps)
+        house_num = houses.house(lon)
         planet_data[name] = {
             "lon": lon,
             "sign": SIGNS[sign_idx],
@@ -139,59 +145,21 @@ def get_full_chart(dt, lat, lon):
 
 def calculate_aspects(planet_data, orb=8.0):
     """Calculate major aspects between planets"""
-    aspect_angles = {
-        0: ("Conjunction", 8.0),
-        60: ("Sextile", 6.0),
-        90: ("Square", 8.0),
-        120: ("Trine", 8.0),
-        180: ("Opposition", 8.0),
-        150: ("Quincunx", 3.0),
-    }
-    
-    aspects = []
-    planets_list = list(planet_data.items())
-    
-    for i, (name1, data1) in enumerate(planets_list):
-        for name2, data2 in planets_list[i+1:]:
-            lon1 = data1["lon"]
-            lon2 = data2["lon"]
-            
-            diff = abs(lon1 - lon2)
-            if diff > 180:
-                diff = 360 - diff
-            
-            for angle, (aspect_name, max_orb) in aspect_angles.items():
-                orb_diff = abs(diff - angle)
-                if orb_diff <= max_orb:
-                    aspects.append({
-                        "object1": name1,
-                        "object2": name2,
-                        "type": aspect_name,
-                        "orb": orb_diff if diff < 180 else -orb_diff,
-                        "angle": angle,
-                    })
-                    break
-    
-    return aspects
+    return chart_math.calculate_aspects(planet_data)
 
 
 def get_house_number(planet_lon, cusps):
     """Return house number (1-12) for a longitude"""
-    planet_lon = planet_lon % 360
-    for i in range(12):
-        cusp_start = cusps[i] % 360
-        cusp_end = cusps[(i + 1) % 12] % 360
-        if cusp_start < cusp_end:
-            if cusp_start <= planet_lon < cusp_end:
-                return i + 1
-        else:  # Wraps over 0°
-            if planet_lon >= cusp_start or planet_lon < cusp_end:
-                return i + 1
-    return 1  # Fallback
+    return chart_math.HouseIndex(cusps).house(planet_lon)
 
 
 # ================== GEOCODING ==================
 def geocode_location(location_str):
+    # Offline index first so common cities resolve without network access
+    local = gazetteer.lookup(location_str)
+    if local is not None:
+        return local
+    
     if not requests:
         raise ImportError("requests library required for geocoding. Install: pip install requests")
     
@@ -199,10 +167,10 @@ def geocode_location(location_str):
     
     if geoapify_key:
         try:
-            response = requests.get(
+            response = http_pool.get(
+                "geoapify",
                 "https://api.geoapify.com/v1/geocode/search",
                 params={"text": location_str, "apiKey": geoapify_key},
-                timeout=10
             )
             if response.status_code == 200 and response.json().get("features"):
                 result = response.json()["features"][0]["properties"]
@@ -211,10 +179,10 @@ def geocode_location(location_str):
             pass
     
     try:
-        response = requests.get(
+        response = http_pool.get(
+            "nominatim",
             "https://nominatim.openstreetmap.org/search",
             params={"q": location_str, "format": "json"},
-            timeout=10,
             headers={"User-Agent": "SoulTether"}
         )
         if response.status_code == 200 and response.json():
@@ -233,33 +201,14 @@ def geocode_location(location_str):
 
 def calculate_fol_nodes():
     """
-    Calculate the 37 nodes of the Flower of Life.
-    24 nodes at 15° intervals + 13 at 7.5° intervals.
-    Each snapped to nearest multiple of 360/432 (0.833° increments).
+    The 37 Flower of Life nodes, snapped to the nearest multiple of 360/432
+    (0.833° increments). See fol.py for the other grids.
     """
-    increment = 360.0 / 432.0
-    
-    nodes = [
-        0, 7.5, 15, 22.5, 30, 37.5, 45, 52.5, 60, 67.5, 75, 82.5, 90, 97.5, 105, 112.5, 120, 127.5, 135, 142.5,
-        150, 157.5, 165, 172.5, 180, 187.5, 195, 202.5, 210, 217.5, 225, 232.5, 240, 247.5, 255, 262.5, 270,
-        277.5, 285, 292.5, 300, 307.5, 315, 322.5, 330, 337.5, 345, 352.5
-    ]
-    
-    nodes = nodes[:37]
-    
-    nodes_snapped = []
-    for angle in nodes:
-        multiple = round(angle / increment)
-        snapped = (multiple % 432) * increment
-        nodes_snapped.append((snapped, multiple % 432))
-    
-    nodes_snapped = sorted(list(set(nodes_snapped)))
-    
-    return nodes_snapped
+    return fol.get_grid().nodes
 
 
-def calculate_fol(chart, orb_threshold=2.0):
-    fol_nodes = calculate_fol_nodes()
+def calculate_fol(chart, orb_threshold=2.0, grid=None):
+    fol_grid = fol.get_grid(grid)
     
     hits = []
     planets_data = {}
@@ -276,35 +225,31 @@ def calculate_fol(chart, orb_threshold=2.0):
     
 
     
-    match_attempts = 0
-    
-    for name, data in planets_data.items():
-        lon = data["lon"] % 360
-        
-        for node_angle, node_multiple in fol_nodes:
-            diff = abs(lon - node_angle)
-            if diff > 180:
-                diff = 360 - diff
-            
-            match_attempts += 1
-            
-            if diff <= orb_threshold:
-                sign = data["sign"]
-                house = data["house"]
-                interpreter = ImmanuelInterpreter()
-                interpretation = interpreter.format_planetary_description(name, sign, house)
-                hits.append(
-                    {
-                        "name": name,
-                        "lon": lon,
-                        "node": node_angle,
-                        "node_multiple": node_multiple,
-                        "orb": diff,
-                        "sign": sign,
-                        "house": house,
-                        "interpretation": interpretation,
-                    }
-                )
+    names = list(planets_data)
+    lons = [planets_data[name]["lon"] % 360 for name in names]
+    
+    for body, node, diff in fol_grid.match_many(lons, orb_threshold):
+        name = names[body]
+        data = planets_data[name]
+        lon = lons[body]
+        node_angle = fol_grid.angles[node]
+        node_multiple = fol_grid.multiples[node]
+        sign = data["sign"]
+        house = data["house"]
+        interpreter = ImmanuelInterpreter()
+        interpretation = interpreter.format_planetary_description(name, sign, house)
+        hits.append(
+            {
+                "name": name,
+                "lon": lon,
+                "node": node_angle,
+                "node_multiple": node_multiple,
+                "orb": diff,
+                "sign": sign,
+                "house": house,
+                "interpretation": interpretation,
+            }
+        )
     
     hits.sort(key=lambda h: h["orb"])
     
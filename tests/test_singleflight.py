@@ -0,0 +1,98 @@
+"""
+Tests for single-flight coalescing across workers sharing a lease database.
+"""
+
+import threading
+import time
+
+import pytest
+
+from singleflight import SingleFlight
+
+
+@pytest.fixture
+def flights(tmp_path):
+    return SingleFlight("test", db_path=str(tmp_path / "flights.sqlite3"), linger=60)
+
+
+def test_do_runs_once_and_returns_result(flights):
+    calls = []
+
+    def generate():
+        calls.append(1)
+        return "reading"
+
+    assert flights.do("key", generate) == "reading"
+    assert calls == [1]
+
+
+def test_failed_owner_is_replaced_by_next_caller(flights):
+    def fail():
+        raise RuntimeError("upstream error")
+
+    with pytest.raises(RuntimeError):
+        flights.do("key", fail)
+
+    # The failed lease lingers, but the next caller takes it over and generates
+    assert flights.do("key", lambda: "reading") == "reading"
+
+
+def test_failed_stream_owner_is_replaced_by_next_caller(flights):
+    def fail():
+        yield "partial "
+        raise RuntimeError("upstream error")
+
+    with pytest.raises(RuntimeError):
+        list(flights.stream("key", fail))
+
+    assert "".join(flights.stream("key", lambda: iter(["a ", "reading"]))) == "a reading"
+
+
+def _worker(tmp_path, **options):
+    """A SingleFlight as another worker would hold it: same lease database,
+    separate in-process state."""
+    options.setdefault("poll_interval", 0.01)
+    options.setdefault("publish_interval", 0)
+    return SingleFlight("test", db_path=str(tmp_path / "flights.sqlite3"), **options)
+
+
+def test_other_worker_follows_lease_progress(tmp_path):
+    owner, follower = _worker(tmp_path), _worker(tmp_path)
+    release = threading.Event()
+
+    def produce():
+        yield "a "
+        release.wait(5)
+        yield "reading"
+
+    def never():
+        raise AssertionError("the follower must not generate")
+
+    owned = owner.stream("key", produce)
+    assert next(owned) == "a "
+
+    # The owner's progress is published into the lease row for the follower
+    followed = follower.stream("key", never)
+    assert next(followed) == "a "
+
+    release.set()
+    assert "".join(owned) == "reading"
+    assert "".join(followed) == "reading"
+
+
+def test_other_worker_takes_over_abandoned_lease(tmp_path):
+    owner, follower = _worker(tmp_path, lease_ttl=0.2), _worker(tmp_path)
+    stalled = threading.Event()
+
+    def stall():
+        # Stands in for a worker that claimed the lease and then hung
+        stalled.set()
+        time.sleep(1)
+        return "late"
+
+    threading.Thread(target=owner.do, args=("key", stall), daemon=True).start()
+    assert stalled.wait(5)
+
+    started = time.monotonic()
+    assert follower.do("key", lambda: "reading") == "reading"
+    assert time.monotonic() - started < 1
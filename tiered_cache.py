@@ -0,0 +1,265 @@
+"""
+Two-level cache: an in-process LRU in front of an optional SQLite table that
+is shared by every worker process pointing at the same database file.
+
+Values must be JSON-serialisable. A stored value of None is treated as a
+negative result (e.g. "location not found") and normally gets a shorter TTL.
+
+For large values (LLM readings) the cache can also bound memory and disk use
+in bytes, and zlib-compress stored values above a size threshold.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+MISS = object()
+
+
+class TieredCache:
+    def __init__(self, namespace, maxsize=1024, ttl=None, negative_ttl=None,
+                 db_path=None, max_rows=100000, max_memory_bytes=None,
+                 max_disk_bytes=None, compress_min_bytes=None, prune_every=500):
+        self.namespace = namespace
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl if negative_ttl is not None else ttl
+        self.db_path = db_path or None
+        self.max_rows = max_rows
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.compress_min_bytes = compress_min_bytes
+        self.prune_every = prune_every
+
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.RLock()
+        self._conn = None
+        self._conn_pid = None
+        self._writes_since_prune = 0
+
+        self._stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "negative_hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "evictions": 0,
+            "expired": 0,
+            "disk_errors": 0,
+            "compressed_stores": 0,
+        }
+
+    def get(self, key):
+        now = time.time()
+
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                expires_at, value, size = entry
+                if expires_at is None or expires_at > now:
+                    self._memory.move_to_end(key)
+                    self._stats["memory_hits"] += 1
+                    if value is None:
+                        self._stats["negative_hits"] += 1
+                    return value
+                self._forget(key)
+                self._stats["expired"] += 1
+
+            row = self._disk_get(key, now)
+            if row is not MISS:
+                expires_at, value, size = row
+                self._remember(key, value, expires_at, size)
+                self._stats["disk_hits"] += 1
+                if value is None:
+                    self._stats["negative_hits"] += 1
+                return value
+
+            self._stats["misses"] += 1
+            return MISS
+
+    def set(self, key, value, ttl=None):
+        if ttl is None:
+            ttl = self.negative_ttl if value is None else self.ttl
+        expires_at = time.time() + ttl if ttl else None
+
+        encoded = json.dumps(value)
+        with self._lock:
+            self._remember(key, value, expires_at, len(encoded))
+            self._disk_set(key, encoded, expires_at)
+            self._stats["stores"] += 1
+
+    def delete(self, key):
+        with self._lock:
+            self._forget(key)
+            conn = self._connection()
+            if conn is None:
+                return
+            try:
+                with conn:
+                    conn.execute(
+                        "DELETE FROM cache WHERE namespace = ? AND key = ?",
+                        (self.namespace, key),
+                    )
+            except sqlite3.Error as e:
+                self._disk_error(e)
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+            conn = self._connection()
+            if conn is None:
+                return
+            try:
+                with conn:
+                    conn.execute("DELETE FROM cache WHERE namespace = ?", (self.namespace,))
+            except sqlite3.Error as e:
+                self._disk_error(e)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["memory_size"] = len(self._memory)
+            stats["memory_maxsize"] = self.maxsize
+            stats["memory_bytes"] = self._memory_bytes
+
+        hits = stats["memory_hits"] + stats["disk_hits"]
+        lookups = hits + stats["misses"]
+        stats["hits"] = hits
+        stats["hit_rate"] = round(hits / lookups, 4) if lookups else 0.0
+        stats["persistent"] = self.db_path is not None
+        return stats
+
+    def _remember(self, key, value, expires_at, size):
+        self._forget(key)
+        if self.max_memory_bytes is not None and size > self.max_memory_bytes:
+            return
+        self._memory[key] = (expires_at, value, size)
+        self._memory_bytes += size
+        while len(self._memory) > self.maxsize or (
+            self.max_memory_bytes is not None and self._memory_bytes > self.max_memory_bytes
+        ):
+            _, (_, _, evicted_size) = self._memory.popitem(last=False)
+            self._memory_bytes -= evicted_size
+            self._stats["evictions"] += 1
+
+    def _forget(self, key):
+        entry = self._memory.pop(key, None)
+        if entry is not None:
+            self._memory_bytes -= entry[2]
+
+    def _connection(self):
+        if self.db_path is None:
+            return None
+
+        # sqlite connections must not be shared across a fork (gunicorn workers)
+        if self._conn is not None and self._conn_pid == os.getpid():
+            return self._conn
+
+        try:
+            conn = sqlite3.connect(self.db_path, timeout=5, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                " namespace TEXT NOT NULL,"
+                " key TEXT NOT NULL,"
+                " value TEXT,"
+                " expires_at REAL,"
+                " stored_at REAL NOT NULL,"
+                " PRIMARY KEY (namespace, key))"
+            )
+            conn.commit()
+        except sqlite3.Error as e:
+            self._disk_error(e)
+            return None
+
+        self._conn = conn
+        self._conn_pid = os.getpid()
+        return conn
+
+    def _disk_get(self, key, now):
+        conn = self._connection()
+        if conn is None:
+            return MISS
+
+        try:
+            row = conn.execute(
+                "SELECT value, expires_at FROM cache WHERE namespace = ? AND key = ?",
+                (self.namespace, key),
+            ).fetchone()
+        except sqlite3.Error as e:
+            self._disk_error(e)
+            return MISS
+
+        if row is None:
+            return MISS
+
+        value, expires_at = row
+        if expires_at is not None and expires_at <= now:
+            self._stats["expired"] += 1
+            return MISS
+
+        # Compressed values are stored as BLOBs, plain ones as TEXT
+        if isinstance(value, bytes):
+            value = zlib.decompress(value).decode("utf-8")
+        return expires_at, json.loads(value), len(value)
+
+    def _disk_set(self, key, encoded, expires_at):
+        conn = self._connection()
+        if conn is None:
+            return
+
+        stored = encoded
+        if self.compress_min_bytes is not None and len(encoded) >= self.compress_min_bytes:
+            stored = zlib.compress(encoded.encode("utf-8"))
+            self._stats["compressed_stores"] += 1
+
+        try:
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO cache (namespace, key, value, expires_at, stored_at)"
+                    " VALUES (?, ?, ?, ?, ?)",
+                    (self.namespace, key, stored, expires_at, time.time()),
+                )
+            self._writes_since_prune += 1
+            if self._writes_since_prune >= self.prune_every:
+                self._prune(conn)
+        except sqlite3.Error as e:
+            self._disk_error(e)
+
+    def _prune(self, conn):
+        self._writes_since_prune = 0
+        with conn:
+            conn.execute(
+                "DELETE FROM cache WHERE namespace = ? AND expires_at IS NOT NULL AND expires_at <= ?",
+                (self.namespace, time.time()),
+            )
+            conn.execute(
+                "DELETE FROM cache WHERE namespace = ? AND key IN ("
+                " SELECT key FROM cache WHERE namespace = ?"
+                " ORDER BY stored_at DESC LIMIT -1 OFFSET ?)",
+                (self.namespace, self.namespace, self.max_rows),
+            )
+            if self.max_disk_bytes is not None:
+                # Keep the newest rows whose combined size fits the budget
+                conn.execute(
+                    "DELETE FROM cache WHERE namespace = ? AND key IN ("
+                    " SELECT key FROM ("
+                    "  SELECT key, SUM(length(value)) OVER (ORDER BY stored_at DESC) AS running"
+                    "  FROM cache WHERE namespace = ?)"
+                    " WHERE running > ?)",
+                    (self.namespace, self.namespace, self.max_disk_bytes),
+                )
+
+    def _disk_error(self, error):
+        self._stats["disk_errors"] += 1
+        logger.warning(f"Cache '{self.namespace}' disk error: {error}")
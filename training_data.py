@@ -0,0 +1,363 @@
+"""
+Shared, indexed access to astrology_training_data.json for both interpreters.
+
+The JSON dataset is compiled once into a compact binary file next to it
+(astrology_training_data.idx) which every worker memory-maps read-only, so
+the pages are shared through the OS page cache and nothing but a handful of
+body names is decoded up front. Outputs are decoded from the text blob only
+when looked up. The file is recompiled automatically (atomically, under a
+lock) whenever the JSON's size or mtime changes.
+
+Lookups used to scan every entry with substring tests. The compiled tables
+reproduce those substring semantics exactly for the known vocabulary (body
+names found in the data, the twelve signs and houses 1-12), keeping the first
+matching entry for every key just like the scans did. Note that "House 1" is
+also a substring of "House 10"-"House 12", which the loose house tables
+preserve. Queries outside the vocabulary fall back to a scan whose result is
+memoized.
+
+File layout (little endian):
+    header   <4sIQQIIIIIIII  magic, version, source mtime_ns, source size,
+                             n_entries, n_bodies, n_general, entries_offset,
+                             bodies_offset, tables_offset, general_offset,
+                             blob_offset
+    entries  <IIII           instruction offset/length, output offset/length
+                             (into the blob)
+    bodies   <H + utf-8      length-prefixed body names, sorted
+    tables   <i              entry index or -1, dense arrays:
+                             planet_sign_house        [body][sign][house]
+                             planet_sign_loose_house  [body][sign][house]
+                             planet_sign              [body][sign]
+                             planet_house             [body][house]
+    general  <I              indexes of "general" entries
+    blob     utf-8           all instruction and output text
+"""
+
+import json
+import mmap
+import os
+import re
+import struct
+import threading
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+SIGNS = [
+    "Aries", "Taurus", "Gemini", "Cancer", "Leo", "Virgo",
+    "Libra", "Scorpio", "Sagittarius", "Capricorn", "Aquarius", "Pisces",
+]
+
+HOUSES = [str(h) for h in range(1, 13)]
+
+# Bodies the interpreters ask about even if no entry is written for them
+EXTRA_BODIES = ["Ascendant", "Midheaven"]
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "astrology_training_data.json")
+
+MAGIC = b"STTD"
+VERSION = 1
+
+HEADER = struct.Struct("<4sIQQIIIIIIII")
+ENTRY = struct.Struct("<IIII")
+STRLEN = struct.Struct("<H")
+INDEX = struct.Struct("<i")
+GENERAL = struct.Struct("<I")
+
+_BODY_PATTERN = re.compile(r"Interpret (.+?) in ")
+_SIGN_IDS = {sign: i for i, sign in enumerate(SIGNS)}
+_HOUSE_IDS = {house: i for i, house in enumerate(HOUSES)}
+_MEMO_LIMIT = 4096
+
+
+def compile_entries(entries, source_mtime_ns=0, source_size=0):
+    """Compiles a list of {"instruction", "output"} entries into the binary
+    layout described above and returns it as bytes."""
+    instructions = [entry.get("instruction", "") for entry in entries]
+    outputs = [entry.get("output", "") for entry in entries]
+
+    bodies = sorted({m.group(1) for m in map(_BODY_PATTERN.match, instructions) if m} | set(EXTRA_BODIES))
+    n_bodies = len(bodies)
+
+    planet_sign_house = [-1] * (n_bodies * 144)
+    planet_sign_loose_house = [-1] * (n_bodies * 144)
+    planet_sign = [-1] * (n_bodies * 12)
+    planet_house = [-1] * (n_bodies * 12)
+
+    def first(table, slot, index):
+        if table[slot] < 0:
+            table[slot] = index
+
+    for index, instruction in enumerate(instructions):
+        planets = [b for b, body in enumerate(bodies) if body in instruction]
+        if not planets:
+            continue
+        signs = [s for s, sign in enumerate(SIGNS) if sign in instruction]
+        houses = [h for h, house in enumerate(HOUSES) if f"(House {house})" in instruction]
+        loose_houses = [h for h, house in enumerate(HOUSES) if f"House {house}" in instruction]
+
+        for b in planets:
+            for h in loose_houses:
+                first(planet_house, b * 12 + h, index)
+            for s in signs:
+                first(planet_sign, b * 12 + s, index)
+                for h in houses:
+                    first(planet_sign_house, (b * 12 + s) * 12 + h, index)
+                for h in loose_houses:
+                    first(planet_sign_loose_house, (b * 12 + s) * 12 + h, index)
+
+    general = [i for i, instruction in enumerate(instructions) if "general" in instruction.lower()]
+
+    blob = bytearray()
+    entry_records = bytearray()
+    for instruction, output in zip(instructions, outputs):
+        record = []
+        for text in (instruction, output):
+            data = text.encode("utf-8")
+            record += [len(blob), len(data)]
+            blob.extend(data)
+        entry_records.extend(ENTRY.pack(*record))
+
+    body_records = bytearray()
+    for body in bodies:
+        data = body.encode("utf-8")
+        body_records.extend(STRLEN.pack(len(data)) + data)
+
+    tables = struct.pack(
+        f"<{len(planet_sign_house) * 2 + len(planet_sign) * 2}i",
+        *planet_sign_house, *planet_sign_loose_house, *planet_sign, *planet_house,
+    )
+    general_records = struct.pack(f"<{len(general)}I", *general)
+
+    entries_offset = HEADER.size
+    bodies_offset = entries_offset + len(entry_records)
+    tables_offset = bodies_offset + len(body_records)
+    general_offset = tables_offset + len(tables)
+    blob_offset = general_offset + len(general_records)
+
+    header = HEADER.pack(
+        MAGIC, VERSION, source_mtime_ns, source_size,
+        len(entries), n_bodies, len(general),
+        entries_offset, bodies_offset, tables_offset, general_offset, blob_offset,
+    )
+    return b"".join([header, entry_records, body_records, tables, general_records, bytes(blob)])
+
+
+class TrainingData:
+    """Read-only view over a compiled dataset (an mmap or bytes)."""
+
+    def __init__(self, buffer):
+        self._buffer = buffer
+        (magic, version, self.source_mtime_ns, self.source_size,
+         self.n_entries, n_bodies, n_general, self._entries_offset, bodies_offset,
+         tables_offset, self._general_offset, self._blob_offset) = HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("Not a compiled SoulTether training data file")
+
+        self.bodies = []
+        offset = bodies_offset
+        for _ in range(n_bodies):
+            length = STRLEN.unpack_from(buffer, offset)[0]
+            offset += STRLEN.size
+            self.bodies.append(bytes(buffer[offset:offset + length]).decode("utf-8"))
+            offset += length
+        self._body_ids = {body: i for i, body in enumerate(self.bodies)}
+
+        self._planet_sign_house = tables_offset
+        self._planet_sign_loose_house = self._planet_sign_house + n_bodies * 144 * INDEX.size
+        self._planet_sign = self._planet_sign_loose_house + n_bodies * 144 * INDEX.size
+        self._planet_house = self._planet_sign + n_bodies * 12 * INDEX.size
+        self._n_general = n_general
+
+        self._general = None
+        self._instructions = None
+        self._memo = {}
+        self._memo_lock = threading.Lock()
+
+    @classmethod
+    def from_entries(cls, entries):
+        return cls(compile_entries(entries))
+
+    def __len__(self):
+        return self.n_entries
+
+    @property
+    def general(self):
+        if self._general is None:
+            self._general = [
+                self.output(GENERAL.unpack_from(self._buffer, self._general_offset + i * GENERAL.size)[0])
+                for i in range(self._n_general)
+            ]
+        return self._general
+
+    def output(self, index):
+        return self._text(index, 2)
+
+    def instruction(self, index):
+        return self._text(index, 0)
+
+    def get_interpretation(self, planet, sign, house):
+        """Planet+sign+"(House h)", then planet+sign, then planet+"House h"."""
+        house = str(house)
+        ids = self._ids(planet, sign, house)
+        if ids is None:
+            return self._memoized(("interpretation", planet, sign, house), self._scan_interpretation)
+
+        b, s, h = ids
+        for slot in (
+            self._planet_sign_house + ((b * 12 + s) * 12 + h) * INDEX.size,
+            self._planet_sign + (b * 12 + s) * INDEX.size,
+            self._planet_house + (b * 12 + h) * INDEX.size,
+        ):
+            index = INDEX.unpack_from(self._buffer, slot)[0]
+            if index >= 0:
+                return self.output(index)
+        return None
+
+    def get_exact(self, planet, sign, house):
+        """First entry mentioning planet, sign and "House h" anywhere."""
+        house = str(house)
+        ids = self._ids(planet, sign, house)
+        if ids is None:
+            return self._memoized(("exact", planet, sign, house), self._scan_exact)
+
+        b, s, h = ids
+        slot = self._planet_sign_loose_house + ((b * 12 + s) * 12 + h) * INDEX.size
+        index = INDEX.unpack_from(self._buffer, slot)[0]
+        return self.output(index) if index >= 0 else None
+
+    def _ids(self, planet, sign, house):
+        b = self._body_ids.get(planet)
+        s = _SIGN_IDS.get(sign)
+        h = _HOUSE_IDS.get(house)
+        if b is None or s is None or h is None:
+            return None
+        return b, s, h
+
+    def _text(self, index, field):
+        record = ENTRY.unpack_from(self._buffer, self._entries_offset + index * ENTRY.size)
+        start = self._blob_offset + record[field]
+        return bytes(self._buffer[start:start + record[field + 1]]).decode("utf-8")
+
+    def _memoized(self, key, scan):
+        with self._memo_lock:
+            if key in self._memo:
+                return self._memo[key]
+        result = scan(*key[1:])
+        with self._memo_lock:
+            if len(self._memo) >= _MEMO_LIMIT:
+                self._memo.clear()
+            self._memo[key] = result
+        return result
+
+    def _scan(self, predicate):
+        # Only queries outside the compiled vocabulary get here
+        if self._instructions is None:
+            self._instructions = [self.instruction(i) for i in range(self.n_entries)]
+        for index, instruction in enumerate(self._instructions):
+            if predicate(instruction):
+                return self.output(index)
+        return None
+
+    def _scan_interpretation(self, planet, sign, house):
+        result = self._scan(lambda i: planet in i and sign in i and f"(House {house})" in i)
+        if result is None:
+            result = self._scan(lambda i: planet in i and sign in i)
+        if result is None:
+            result = self._scan(lambda i: planet in i and f"House {house}" in i)
+        return result
+
+    def _scan_exact(self, planet, sign, house):
+        return self._scan(lambda i: planet in i and sign in i and f"House {house}" in i)
+
+
+def compiled_path(path):
+    return os.path.splitext(path)[0] + ".idx"
+
+
+def compile_file(path, output=None):
+    """Compiles the JSON dataset at path and atomically writes the result."""
+    output = output or compiled_path(path)
+    stat = os.stat(path)
+    with open(path, 'r') as f:
+        entries = json.load(f)
+
+    data = compile_entries(entries, stat.st_mtime_ns, stat.st_size)
+    tmp_path = f"{output}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, output)
+    return len(entries)
+
+
+def _is_current(output, source):
+    try:
+        with open(output, "rb") as f:
+            header = f.read(HEADER.size)
+        magic, version, mtime_ns, size = HEADER.unpack(header)[:4]
+    except (OSError, struct.error):
+        return False
+    if magic != MAGIC or version != VERSION:
+        return False
+    if source is None:
+        return True
+    return mtime_ns == source.st_mtime_ns and size == source.st_size
+
+
+def load(path=DEFAULT_PATH):
+    """Maps the compiled dataset for path, (re)compiling it if it is missing
+    or stale. Falls back to an in-memory compile if the directory is read-only."""
+    output = compiled_path(path)
+    try:
+        source = os.stat(path)
+    except OSError:
+        source = None
+
+    if source is None and not os.path.exists(output):
+        print("⚠ Training data file not found")
+        return TrainingData.from_entries([])
+
+    try:
+        if not _is_current(output, source):
+            with open(f"{output}.lock", "a") as lock:
+                if fcntl is not None:
+                    fcntl.flock(lock, fcntl.LOCK_EX)
+                # Another worker may have compiled it while we waited
+                if not _is_current(output, source):
+                    count = compile_file(path, output)
+                    print(f"✓ Compiled {count} training interpretations to {output}")
+
+        with open(output, "rb") as f:
+            data = TrainingData(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+        print(f"✓ Loaded {len(data)} training interpretations")
+        return data
+    except (OSError, ValueError, struct.error) as e:
+        print(f"⚠ Could not use compiled training data ({e}); compiling in memory")
+
+    try:
+        with open(path, 'r') as f:
+            data = TrainingData.from_entries(json.load(f))
+        print(f"✓ Loaded {len(data)} training interpretations")
+        return data
+    except Exception as e:
+        print(f"⚠ Error loading training data: {e}")
+        return TrainingData.from_entries([])
+
+
+_training_data = None
+_training_data_lock = threading.Lock()
+
+
+def get_training_data(path=None):
+    """Returns the process-wide TrainingData, loading it on first use."""
+    global _training_data
+
+    if _training_data is not None:
+        return _training_data
+
+    with _training_data_lock:
+        if _training_data is None:
+            _training_data = load(path or os.environ.get("TRAINING_DATA_JSON", DEFAULT_PATH))
+    return _training_data
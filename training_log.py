@@ -0,0 +1,202 @@
+"""
+Batched background writer for the training-data JSONL log.
+
+Each worker process appends to its own segment file from a background thread,
+so request threads only enqueue a record and concurrent gunicorn workers never
+interleave partial lines. Segments are rotated by size/age and compacted into
+the main training_data.jsonl under an exclusive file lock.
+"""
+
+import atexit
+import glob
+import json
+import logging
+import os
+import queue
+import re
+import socket
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class TrainingLogWriter:
+    def __init__(self, path="training_data.jsonl", segment_dir="training_data_segments",
+                 flush_size=100, flush_interval=2.0, rotate_bytes=8 * 1024 * 1024,
+                 rotate_interval=3600, max_queue=10000):
+        self.path = path
+        self.segment_dir = segment_dir
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.rotate_bytes = rotate_bytes
+        self.rotate_interval = rotate_interval
+        self.max_queue = max_queue
+
+        self._queue = None
+        self._thread = None
+        self._pid = None
+        self._start_lock = threading.Lock()
+        self._segment = None
+        self._segment_path = None
+        self._segment_opened = 0.0
+
+        self.written = 0
+        self.dropped = 0
+
+    def write(self, record):
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            logger.warning("Training log queue full; dropping record")
+
+    def stats(self):
+        return {
+            "written": self.written,
+            "dropped": self.dropped,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "segment": self._segment_path if self._segment is not None else None,
+        }
+
+    def close(self, timeout=10):
+        if self._thread is None or self._pid != os.getpid():
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _ensure_started(self):
+        # The writer thread does not survive fork, so each worker starts its own
+        if self._thread is not None and self._pid == os.getpid():
+            return
+
+        with self._start_lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._queue = queue.Queue(maxsize=self.max_queue)
+            self._segment = None
+            self._thread = threading.Thread(target=self._run, name="training-log-writer", daemon=True)
+            self._thread.start()
+            atexit.register(self.close)
+
+    def _run(self):
+        buffer = []
+        deadline = time.monotonic() + self.flush_interval
+
+        while True:
+            try:
+                item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                item = None
+
+            stopping = item is _STOP
+            if item is not None and not stopping:
+                buffer.append(json.dumps(item) + "\n")
+
+            if buffer and (stopping or len(buffer) >= self.flush_size or time.monotonic() >= deadline):
+                self._flush(buffer)
+                buffer = []
+
+            if time.monotonic() >= deadline:
+                deadline = time.monotonic() + self.flush_interval
+                if self._segment is not None and time.time() - self._segment_opened >= self.rotate_interval:
+                    self._rotate()
+
+            if stopping:
+                self._rotate()
+                return
+
+    def _flush(self, lines):
+        try:
+            if self._segment is None:
+                self._open_segment()
+            self._segment.write("".join(lines))
+            self._segment.flush()
+            self.written += len(lines)
+            if self._segment.tell() >= self.rotate_bytes:
+                self._rotate()
+        except OSError as e:
+            logger.error(f"Could not write training data: {e}")
+
+    def _open_segment(self):
+        os.makedirs(self.segment_dir, exist_ok=True)
+        name = f"segment-{socket.gethostname()}-{os.getpid()}-{int(time.time() * 1000)}.jsonl.open"
+        self._segment_path = os.path.join(self.segment_dir, name)
+        self._segment = open(self._segment_path, "a")
+        self._segment_opened = time.time()
+
+    def _rotate(self):
+        if self._segment is not None:
+            try:
+                self._segment.close()
+                os.replace(self._segment_path, self._segment_path[:-len(".open")])
+            except OSError as e:
+                logger.error(f"Could not seal training data segment: {e}")
+            self._segment = None
+        # Runs on the writer thread, which must outlive a failed compaction
+        try:
+            self.compact()
+        except Exception as e:
+            logger.error(f"Could not compact training data: {e}")
+
+    def compact(self):
+        """Appends every sealed segment (and segments orphaned by dead local
+        workers) to the main log, then removes them."""
+        self._seal_orphans()
+        segments = sorted(glob.glob(os.path.join(self.segment_dir, "segment-*.jsonl")))
+        if not segments:
+            return
+
+        try:
+            with open(f"{self.path}.lock", "a") as lock:
+                if fcntl is not None:
+                    fcntl.flock(lock, fcntl.LOCK_EX)
+                with open(self.path, "a") as out:
+                    for segment in segments:
+                        try:
+                            with open(segment) as f:
+                                out.write(f.read())
+                            out.flush()
+                            os.remove(segment)
+                        except FileNotFoundError:
+                            # Another worker compacted it first
+                            continue
+        except OSError as e:
+            logger.error(f"Could not compact training data: {e}")
+
+    def _seal_orphans(self):
+        host = socket.gethostname()
+        # The glob also matches hosts whose names extend this one (web-2 for web)
+        pattern = re.compile(rf"segment-{re.escape(host)}-(\d+)-\d+\.jsonl\.open")
+        for path in glob.glob(os.path.join(self.segment_dir, f"segment-{host}-*.jsonl.open")):
+            if path == self._segment_path and self._segment is not None:
+                continue
+            match = pattern.fullmatch(os.path.basename(path))
+            if match is None:
+                continue
+            pid = int(match.group(1))
+            if pid != os.getpid() and not _pid_alive(pid):
+                try:
+                    os.replace(path, path[:-len(".open")])
+                except OSError:
+                    pass
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True
+    return True